@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Daily, Custom, Outline
+from .models import Candidate, Daily, Custom, Event, Outline, Solution, SolveJob
 
 
 class GameAdmin(admin.ModelAdmin):
@@ -11,5 +11,30 @@ class OutlineAdmin(admin.ModelAdmin):
     list_display = ('index',)
 
 
+class CandidateAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'outline', 'moves_min_num', 'solutions', 'created_at')
+    list_filter = ('outline',)
+
+
+class SolutionAdmin(admin.ModelAdmin):
+    list_display = ('fingerprint',)
+    search_fields = ('fingerprint',)
+
+
+class SolveJobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'status', 'created_at', 'finished_at')
+    list_filter = ('status',)
+
+
+class EventAdmin(admin.ModelAdmin):
+    list_display = ('game_index', 'kind', 'length', 'game_time', 'created_at')
+    list_filter = ('kind',)
+    search_fields = ('game_index',)
+
+
 admin.site.register((Daily, Custom), GameAdmin)
-admin.site.register(Outline, OutlineAdmin)
\ No newline at end of file
+admin.site.register(Outline, OutlineAdmin)
+admin.site.register(Candidate, CandidateAdmin)
+admin.site.register(Solution, SolutionAdmin)
+admin.site.register(SolveJob, SolveJobAdmin)
+admin.site.register(Event, EventAdmin)
\ No newline at end of file
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class GameConfig(AppConfig):
     name = 'apps.game'
+
+    def ready(self):
+        from . import caching  # noqa: F401, connects the signals that invalidate cached pages
+        from .tables import load_tables
+        load_tables()
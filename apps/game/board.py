@@ -1,11 +1,16 @@
-from typing import Any, Iterable, Sequence
+from functools import cached_property, lru_cache
+from operator import itemgetter
+from typing import Any, Callable, Iterable, Sequence
 
+from .packing import PackedMoveSet
 from .utils import lst_to_lst_of_lsts
 
 
 class Cell:
     colors_dict = {i: c for i, c in enumerate(('red', 'green', 'blue', 'purple'), start=1)}
     names_dict = {1: 'A', 2: 'B', 3: 'C', 4: 'D', 0: ''}
+    # cells are shared between requests, see init_borders
+    __slots__ = ('row', 'col', 'name', 'display_name', 'color_class', 'border_styles')
 
     def __init__(self, row: int, col: int, for_outline: bool, border_dict: dict, name: int = 0):
         self.row = row
@@ -13,57 +18,55 @@ class Cell:
         self.name = name
         if for_outline:
             self.display_name = ''
+            self.color_class = self.colors_dict[-name] if name < 0 else ''
         else:
             self.display_name = self.names_dict[abs(name)]
-        self.border_dict = border_dict
-        self.cell_size = f'var(--cell-size)'
-        self.thickness = 'round(down, var(--grid-thickness), 2px)'
-        self.for_outline = for_outline
-
-    @property
-    def color_class(self) -> str:
-        if self.for_outline:
-            return self.colors_dict[-self.name] if self.name < 0 else ''
-        else:
-            return '' if self.name == 0 else self.colors_dict[abs(self.name)]
-
-    @property
-    def border_styles(self) -> Sequence[str]:
-        increment = f'{self.thickness} / 2'
-        length = f'{self.cell_size} + {self.thickness}'
-        offset_y = f'{self.cell_size} * {self.row} - {increment}'
-        offset_x = f'{self.cell_size} * {self.col} - {increment}'
-        lst = []
-        if self.border_dict.get('left'):
-            lst.append(dict(width=self.thickness,
-                            height=length,
-                            top=offset_y,
-                            left=offset_x))
-        if self.border_dict.get('top'):
-            lst.append(dict(height=self.thickness,
-                            width=length,
-                            top=offset_y,
-                            left=offset_x))
-        if self.border_dict.get('right'):
-            lst.append(dict(width=self.thickness,
-                            height=length,
-                            top=offset_y,
-                            left=f'{offset_x} + {self.cell_size}'))
-        if self.border_dict.get('bottom'):
-            lst.append(dict(height=self.thickness,
-                            width=length,
-                            top=f'{offset_y} + {self.cell_size}',
-                            left=offset_x))
-        return [''.join(f'{key}:calc({value});' for key, value in item.items()) for item in lst]
-
-
-def init_borders(outline: Sequence[Any], board: Sequence[Any] | None = None) -> Sequence[Cell]:
-    outline = lst_to_lst_of_lsts(outline)
-    if board:
-        board = lst_to_lst_of_lsts(board)
-    cells = []
+            self.color_class = '' if name == 0 else self.colors_dict[abs(name)]
+        self.border_styles = border_styles(row, col, *(bool(border_dict.get(side)) for side in SIDES))
+
+
+SIDES = ('left', 'top', 'right', 'bottom')
+
+
+@lru_cache(maxsize=1024)
+def border_styles(row: int, col: int, left: bool, top: bool, right: bool, bottom: bool) -> tuple[str, ...]:
+    cell_size = 'var(--cell-size)'
+    thickness = 'round(down, var(--grid-thickness), 2px)'
+    increment = f'{thickness} / 2'
+    length = f'{cell_size} + {thickness}'
+    offset_y = f'{cell_size} * {row} - {increment}'
+    offset_x = f'{cell_size} * {col} - {increment}'
+    lst = []
+    if left:
+        lst.append(dict(width=thickness,
+                        height=length,
+                        top=offset_y,
+                        left=offset_x))
+    if top:
+        lst.append(dict(height=thickness,
+                        width=length,
+                        top=offset_y,
+                        left=offset_x))
+    if right:
+        lst.append(dict(width=thickness,
+                        height=length,
+                        top=offset_y,
+                        left=f'{offset_x} + {cell_size}'))
+    if bottom:
+        lst.append(dict(height=thickness,
+                        width=length,
+                        top=f'{offset_y} + {cell_size}',
+                        left=offset_x))
+    return tuple(''.join(f'{key}:calc({value});' for key, value in item.items()) for item in lst)
+
+
+@lru_cache(maxsize=256)
+def outline_borders(outline: tuple, cols: int | None = None) -> tuple[tuple[dict, ...], ...]:
+    # Sides of every cell that get a border, from the outline alone
+    outline = lst_to_lst_of_lsts(outline, cols)
+    rows = []
     border = dict(top=(0, -1), bottom=(0, 1), left=(-1, 0), right=(1, 0))
-    for row_index, row in enumerate(board or outline):
+    for row_index, row in enumerate(outline):
         current_row = []
         for col_index, digit in enumerate(row):
             cell_border = {k: True for k in border}
@@ -76,14 +79,31 @@ def init_borders(outline: Sequence[Any], board: Sequence[Any] | None = None) ->
                 except IndexError:
                     pass
                 else:
-                    cell_border[name] = name not in ('top', 'left') and outline[row_index][col_index] != neighbour
-            current_row.append(
-                Cell(row_index, col_index,
-                     name=digit,
-                     for_outline=board is None,
-                     border_dict=cell_border))
-        cells.append(current_row)
-    return cells
+                    cell_border[name] = name not in ('top', 'left') and digit != neighbour
+            current_row.append(cell_border)
+        rows.append(tuple(current_row))
+    return tuple(rows)
+
+
+@lru_cache(maxsize=256)
+def outline_cells(outline: tuple, cols: int | None = None) -> tuple[tuple[Cell, ...], ...]:
+    return tuple(tuple(Cell(row_index, col_index, True, cell_border, name=digit)
+                       for col_index, (digit, cell_border) in enumerate(zip(row, borders)))
+                 for row_index, (row, borders) in enumerate(zip(lst_to_lst_of_lsts(outline, cols),
+                                                                 outline_borders(outline, cols))))
+
+
+def init_borders(outline: Sequence[Any], board: Sequence[Any] | None = None,
+                 cols: int | None = None) -> Sequence[Sequence[Cell]]:
+    # The borders only depend on the outline, so they are computed once per outline, and the cells
+    # of the outline alone are shared between requests. Nothing may change them.
+    outline = tuple(outline)
+    if not board:
+        return outline_cells(outline, cols)
+    return tuple(tuple(Cell(row_index, col_index, False, cell_border, name=digit)
+                       for col_index, (digit, cell_border) in enumerate(zip(row, borders)))
+                 for row_index, (row, borders) in enumerate(zip(lst_to_lst_of_lsts(board, cols),
+                                                                 outline_borders(outline, cols))))
 
 
 class Node:
@@ -103,8 +123,8 @@ class Node:
     def get_target_indices(self):
         return self.indices
 
-    def move(self, s, direct: bool = True) -> tuple[int, ...]:
-        s = list(s)
+    def permutation(self, cells: int, direct: bool = True) -> tuple[int, ...]:
+        # position i of the moved state takes the value at position permutation[i]
         if direct:
             source_indices = self.get_source_indices()
             target_indices = self.get_target_indices()
@@ -112,9 +132,13 @@ class Node:
             source_indices = self.get_target_indices()
             target_indices = self.get_source_indices()
 
-        for index, value in zip(target_indices, [s[i] for i in source_indices]):
-            s[index] = value
-        return tuple(s)
+        permutation = list(range(cells))
+        for index, value in zip(target_indices, source_indices):
+            permutation[index] = value
+        return tuple(permutation)
+
+    def move(self, s, direct: bool = True) -> tuple[int, ...]:
+        return itemgetter(*self.permutation(len(s), direct))(s)
 
     def name(self):
         return self.__class__.__name__.lower()
@@ -183,7 +207,64 @@ class Vertical(Horizontal):
         return self.index
 
 
-def get_nodes(n: int, m: int, disabled_nodes: dict | None = None) -> Sequence[Node]:
+class MoveSet:
+    """
+    Allowed moves of a node set compiled to permutations, each applied to a state with one itemgetter call.
+    `forward` holds the moves in the order they are tried from the start, `backward` the moves that undo them,
+    labelled with the move they undo, in the order they are tried from the goal.
+    """
+
+    def __init__(self, nodes: Iterable[Node], cells: int):
+        self.cells = cells
+        self.forward_permutations: list[tuple[tuple[int, ...], tuple[int, str]]] = []
+        self.backward_permutations: list[tuple[tuple[int, ...], tuple[int, str]]] = []
+        for node in nodes:
+            direct = node.permutation(cells, True)
+            reverse = node.permutation(cells, False)
+            if node.allow_direct:
+                self.forward_permutations.append((direct, (node.index, node.symbol)))
+            if node.allow_reverse:
+                self.forward_permutations.append((reverse, (node.index, node.reverse_symbol)))
+                self.backward_permutations.append((direct, (node.index, node.reverse_symbol)))
+            if node.allow_direct:
+                self.backward_permutations.append((reverse, (node.index, node.symbol)))
+        self.forward: list[tuple[Callable, tuple[int, str]]] = [
+            (itemgetter(*permutation), mv) for permutation, mv in self.forward_permutations]
+        self.backward: list[tuple[Callable, tuple[int, str]]] = [
+            (itemgetter(*permutation), mv) for permutation, mv in self.backward_permutations]
+
+    @cached_property
+    def redundant(self) -> list[list[bool]]:
+        # redundant[i][j]: forward move j right after move i either undoes it or commutes with it
+        # and is tried in the other order, so depth-first searches can skip it.
+        permutations = [permutation for permutation, _ in self.forward_permutations]
+        identity = tuple(range(self.cells))
+
+        def compose(first, second):
+            return tuple(first[i] for i in second)
+
+        return [[compose(a, b) == identity or (j < i and compose(a, b) == compose(b, a))
+                 for j, b in enumerate(permutations)]
+                for i, a in enumerate(permutations)]
+
+
+class NodeSet(list):
+    def __init__(self, nodes: Iterable[Node], rows: int, cols: int):
+        super().__init__(nodes)
+        self.rows = rows
+        self.cols = cols
+        self.cells = rows * cols
+
+    @cached_property
+    def moves(self) -> MoveSet:
+        return MoveSet(self, self.cells)
+
+    @cached_property
+    def packed_moves(self) -> PackedMoveSet:
+        return PackedMoveSet(self.moves.forward_permutations, self.moves.backward_permutations, self.cells)
+
+
+def get_nodes(n: int, m: int, disabled_nodes: dict | None = None) -> NodeSet:
     disabled_nodes = disabled_nodes or {}
     def _create_class(klass, ins, idx, s=0):
         disallow_direct, disallow_reverse = disabled_nodes.get(idx + s + 1, (False, False))
@@ -207,4 +288,4 @@ def get_nodes(n: int, m: int, disabled_nodes: dict | None = None) -> Sequence[No
     for index in range(n):
         nodes.append(_create_class(Horizontal, range(index * m, (index + 1) * m), index, shift))
 
-    return nodes
+    return NodeSet(nodes, n, m)
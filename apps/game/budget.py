@@ -0,0 +1,80 @@
+import copy
+import sys
+import threading
+import time
+from typing import Any
+
+# time and cancellation are only looked at every CHECK_INTERVAL states
+CHECK_INTERVAL = 1024
+# dict slot plus the (parent, move) tuple kept for every visited state
+ENTRY_OVERHEAD = 3 * 8 + sys.getsizeof((None, None))
+
+
+class CancelToken:
+    """Lets another thread stop a running search."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class BudgetExceeded(Exception):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Budget:
+    """
+    Limits of one search: visited states, wall-clock seconds and approximate bytes of the
+    visited sets, any of them None for no limit, plus an optional cancel token.
+    """
+
+    def __init__(self, max_states: int | None = None, max_seconds: float | None = None,
+                 max_bytes: int | None = None, token: CancelToken | None = None):
+        self.max_states = max_states
+        self.max_seconds = max_seconds
+        self.max_bytes = max_bytes
+        self.token = token
+        self.started = time.monotonic()
+        self.state_size = None
+        self._next_check = CHECK_INTERVAL
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def check(self, states: int, sample: Any = None, state_size: int | None = None):
+        # Called with the number of stored states. The bytes estimate uses `state_size` if given,
+        # otherwise the size of `sample`, one of the states.
+        if self.max_states is not None and states > self.max_states:
+            raise BudgetExceeded('states')
+        if self.max_bytes is not None:
+            if state_size is not None:
+                self.state_size = state_size
+            elif self.state_size is None and sample is not None:
+                self.state_size = sys.getsizeof(sample) + ENTRY_OVERHEAD
+            if self.state_size is not None and states * self.state_size > self.max_bytes:
+                raise BudgetExceeded('bytes')
+        if states >= self._next_check:
+            self._next_check = states + CHECK_INTERVAL
+            self.poll()
+
+    def poll(self):
+        if self.token is not None and self.token.cancelled:
+            raise BudgetExceeded('cancelled')
+        if self.max_seconds is not None and self.elapsed > self.max_seconds:
+            raise BudgetExceeded('time')
+
+    def limited(self, max_states: int) -> 'Budget':
+        # The same clock, bytes and token with at most `max_states` states, for one stage of a search.
+        budget = copy.copy(self)
+        budget.max_states = max_states if self.max_states is None else min(self.max_states, max_states)
+        budget._next_check = CHECK_INTERVAL
+        return budget
@@ -0,0 +1,167 @@
+import atexit
+import datetime
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import close_old_connections
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Custom, Daily, Outline, PageCacheCounter, RenderedDaily
+
+logger = logging.getLogger(__name__)
+
+# kinds of cached HTML, see CountingCache.kind
+KINDS = ('page', 'outline', 'board', 'nodes')
+# seconds between the writes of the hit counters of a process
+FLUSH_INTERVAL = 10
+MISSING = object()
+
+
+@lru_cache(maxsize=None)
+def page_version() -> tuple[str, datetime.datetime]:
+    # Templates and the static files they link only change with a deploy: a hash of both and
+    # the time of the newest template.
+    digest = hashlib.sha256(getattr(staticfiles_storage, 'manifest_hash', '').encode())
+    modified = 0
+    for directory in settings.TEMPLATES[0]['DIRS']:
+        for path in sorted(Path(directory).rglob('*.html')):
+            digest.update(path.read_bytes())
+            modified = max(modified, path.stat().st_mtime)
+    return digest.hexdigest(), datetime.datetime.fromtimestamp(modified, datetime.timezone.utc)
+
+
+def cache_key(*parts) -> str:
+    # for content that only depends on `parts` and the deployed templates
+    return hashlib.sha256(repr((parts, page_version()[0])).encode()).hexdigest()
+
+
+class HitCounter:
+    """
+    Hits and misses of the page cache in this process, added to PageCacheCounter with F()
+    updates by a background thread every FLUSH_INTERVAL seconds and at exit, so the counts of
+    all workers add up and a request only touches memory.
+    """
+
+    def __init__(self):
+        self.pending = Counter()
+        self.lock = threading.Lock()
+        self.pid = None
+
+    def count(self, kind: str, hit: bool):
+        with self.lock:
+            self.pending[kind, hit] += 1
+            if self.pid != os.getpid():
+                # first count of this process, forked workers start their own thread
+                self.pid = os.getpid()
+                threading.Thread(target=self._run, name='page-hit-counter', daemon=True).start()
+
+    def _run(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except Exception:
+                # the counts wait for the next round
+                logger.exception('Could not write the page cache counters')
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+        if not pending:
+            return
+        close_old_connections()
+        try:
+            for kind in {kind for kind, _ in pending}:
+                changes = dict(hits=F('hits') + pending[kind, True], misses=F('misses') + pending[kind, False])
+                if not PageCacheCounter.objects.filter(kind=kind).update(**changes):
+                    PageCacheCounter.objects.get_or_create(kind=kind)
+                    PageCacheCounter.objects.filter(kind=kind).update(**changes)
+        except Exception:
+            with self.lock:
+                self.pending.update(pending)
+            raise
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        self.flush()
+        counters = {row['kind']: row for row in PageCacheCounter.objects.values('kind', 'hits', 'misses')}
+        return {kind: {outcome: counters.get(kind, {}).get(outcome, 0) for outcome in ('hits', 'misses')}
+                for kind in KINDS}
+
+    def reset(self):
+        with self.lock:
+            self.pending.clear()
+        PageCacheCounter.objects.update(hits=0, misses=0)
+
+
+hit_counter = HitCounter()
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        hit_counter.flush()
+    except Exception:
+        logger.exception('Could not write the page cache counters at exit')
+
+
+class CountingCache:
+    """Cache backend mixin that counts the hits and misses of `get` per kind of HTML, see HitCounter."""
+
+    @staticmethod
+    def kind(key: str) -> str:
+        # 'page.<model>.<index>' or, for {% cache %} fragments, 'template.cache.<fragment name>.<hash>'
+        parts = key.split('.')
+        return parts[2] if key.startswith('template.cache.') else parts[0]
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, MISSING, version=version)
+        hit_counter.count(self.kind(key), value is not MISSING)
+        return default if value is MISSING else value
+
+
+class CountingFileBasedCache(CountingCache, FileBasedCache):
+    pass
+
+
+def page_cache():
+    return caches['pages']
+
+
+def page_key(model_name: str, index) -> str:
+    # one entry per puzzle, its value is the cache_key of the page and the HTML
+    return f'page.{model_name.lower()}.{index}'
+
+
+@receiver(post_save, sender=Daily)
+@receiver(post_save, sender=Custom)
+@receiver(post_save, sender=Outline)
+@receiver(post_delete, sender=Daily)
+@receiver(post_delete, sender=Custom)
+@receiver(post_delete, sender=Outline)
+def invalidate_pages(sender, instance, created: bool = False, **kwargs):
+    # Edits of existing rows, in the admin, drop the pages showing them and the stored pages of
+    # today's puzzle until prerender_dailies runs again. New puzzles have nothing cached yet.
+    # Fragments need nothing: their keys hash what they show.
+    if created:
+        return
+    if sender is Outline:
+        dailies = list(Daily.objects.filter(outline=instance).values_list('index', flat=True))
+        customs = list(Custom.objects.filter(outline=instance).values_list('index', flat=True))
+    else:
+        dailies = [instance.index] if sender is Daily else []
+        customs = [instance.index] if sender is Custom else []
+    page_cache().delete_many([page_key('Daily', index) for index in dailies] +
+                             [page_key('Custom', index) for index in customs])
+    RenderedDaily.objects.filter(index__in=dailies).delete()
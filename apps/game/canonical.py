@@ -0,0 +1,132 @@
+import hashlib
+from collections.abc import Sequence
+from functools import cached_property, lru_cache
+
+from .board import NodeSet, get_nodes
+from .utils import encode
+
+
+class Symmetry:
+    """
+    A rotation or reflection of the board. The transformed state takes the value of cell
+    `cells[i]` of the original at position i, and `moves` maps every directed move of the
+    original board, as (node position, direct), to the move that does the same in the transformed one.
+    """
+
+    def __init__(self, rows: int, cols: int, transpose: bool, flip_rows: bool, flip_cols: bool):
+        self.rows, self.cols = (cols, rows) if transpose else (rows, cols)
+        cells = []
+        for row in range(self.rows):
+            for col in range(self.cols):
+                r, c = (col, row) if transpose else (row, col)
+                if flip_rows:
+                    r = rows - 1 - r
+                if flip_cols:
+                    c = cols - 1 - c
+                cells.append(r * cols + c)
+        self.cells = tuple(cells)
+
+        inverse = [0] * len(cells)
+        for target, source in enumerate(cells):
+            inverse[source] = target
+        transformed_nodes = get_nodes(self.rows, self.cols)
+        positions = {}
+        for position, node in enumerate(transformed_nodes):
+            for direct in (True, False):
+                positions[node.permutation(len(cells), direct)] = position
+        # Nodes are mapped as a whole, so every directed move gets a move of its own even when
+        # both directions permute alike, as shifts of a line of two cells do.
+        self.moves = {}
+        for position, node in enumerate(get_nodes(rows, cols)):
+            permutation = node.permutation(len(cells))
+            conjugate = tuple(inverse[permutation[cell]] for cell in cells)
+            transformed_position = positions[conjugate]
+            same = transformed_nodes[transformed_position].permutation(len(cells)) == conjugate
+            self.moves[position, True] = (transformed_position, same)
+            self.moves[position, False] = (transformed_position, not same)
+
+    def transform(self, state: Sequence[int]) -> tuple[int, ...]:
+        return tuple(state[cell] for cell in self.cells)
+
+
+@lru_cache(maxsize=None)
+def symmetries(rows: int, cols: int) -> tuple[Symmetry, ...]:
+    transposes = (False, True) if rows == cols else (False,)
+    return tuple(Symmetry(rows, cols, transpose, flip_rows, flip_cols)
+                 for transpose in transposes for flip_rows in (False, True) for flip_cols in (False, True))
+
+
+def relabel(goal: tuple[int, ...], start: tuple[int, ...]) -> tuple[tuple[int, ...], tuple[int, ...]]:
+    # Fixed colours are renamed in order of appearance in the goal, the other groups by utils.encode.
+    colours = {}
+    for label in goal:
+        if label < 0 and label not in colours:
+            colours[label] = -len(colours) - 1
+    return (encode([colours.get(label, label) for label in goal], {}),
+            encode([colours.get(label, label) for label in start], {}))
+
+
+class Canonical:
+    """
+    The representative of a puzzle under the symmetries of the board and the renaming of colours.
+    Puzzles with equal keys have the same optimal solutions up to `to_original`; the part of the key
+    without the start, `config_key`, identifies the goal and move set that tables are built for.
+    """
+
+    def __init__(self, symmetry: Symmetry, start: tuple[int, ...], goal: tuple[int, ...],
+                 allowed: tuple[bool, ...], original: NodeSet):
+        self.symmetry = symmetry
+        self.start = start
+        self.goal = goal
+        self.allowed = allowed
+        self.key = (symmetry.rows, symmetry.cols, goal, allowed, start)
+        self.config_key = self.key[:4]
+        self.nodes = get_nodes(symmetry.rows, symmetry.cols)
+        for node, (allow_direct, allow_reverse) in zip(self.nodes, zip(allowed[::2], allowed[1::2])):
+            node.allow_direct = allow_direct
+            node.allow_reverse = allow_reverse
+
+        self._moves = {}
+        for position, node in enumerate(original):
+            for direct in (True, False):
+                transformed_position, transformed_direct = symmetry.moves[position, direct]
+                transformed = self.nodes[transformed_position]
+                self._moves[transformed.index, _symbol(transformed, transformed_direct)] = (
+                    node.index, _symbol(node, direct))
+
+    @cached_property
+    def fingerprint(self) -> str:
+        return hashlib.sha256(repr(self.key).encode()).hexdigest()
+
+    def to_original(self, moves: Sequence[tuple[int, str]]) -> list[tuple[int, str]]:
+        return [self._moves[tuple(mv)] for mv in moves]
+
+    def to_canonical(self, moves: Sequence[tuple[int, str]]) -> list[tuple[int, str]]:
+        inverse = {original: mv for mv, original in self._moves.items()}
+        return [inverse[tuple(mv)] for mv in moves]
+
+    def __eq__(self, other):
+        return isinstance(other, Canonical) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+
+def _symbol(node, direct: bool) -> str:
+    return node.symbol if direct else node.reverse_symbol
+
+
+def canonicalize(start: tuple[int, ...], goal: tuple[int, ...], nodes: NodeSet) -> Canonical:
+    allowed = [None] * (2 * len(nodes))
+    best = None
+    for symmetry in symmetries(nodes.rows, nodes.cols):
+        for position, node in enumerate(nodes):
+            for direct, allow in ((True, node.allow_direct), (False, node.allow_reverse)):
+                transformed_position, transformed_direct = symmetry.moves[position, direct]
+                allowed[2 * transformed_position + (not transformed_direct)] = allow
+        transformed_goal, transformed_start = relabel(symmetry.transform(goal), symmetry.transform(start))
+        key = (symmetry.rows, symmetry.cols, transformed_goal, tuple(allowed), transformed_start)
+        if best is None or key < best[0]:
+            best = key, symmetry
+    (_, _, goal, allowed, start), symmetry = best
+    return Canonical(symmetry, start, goal, allowed, nodes)
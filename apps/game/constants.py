@@ -3,6 +3,14 @@ import datetime
 CUSTOM_GAME_STR = 'abcdefghkmnpqrstuvwxyz123456789'
 CUSTOM_GAME_SLUG_LENGTH = 7
 
+DEFAULT_BOARD_SIDE = 4
+MIN_BOARD_SIDE = 2
+MAX_BOARD_SIDE = 6
+
+# seconds browsers and CDNs may keep a page of today's puzzle, and of a custom puzzle
+DAILY_MAX_AGE = 5 * 60
+CUSTOM_MAX_AGE = 7 * 24 * 60 * 60
+
 START_DATE = datetime.datetime(2025, 11, 25)
 DATE_FORMAT = '%B %d, %Y'
 JS_DATE_FORMAT = '%Y-%m-%d'
@@ -0,0 +1,139 @@
+from collections.abc import Iterator, Sequence
+
+from .board import NodeSet
+from .budget import Budget, BudgetExceeded
+from .canonical import canonicalize
+from .packing import MAX_PACKED_LABEL, pack
+from .solver import SolveResult, neighbors
+from .tables import get_table
+from .utils import encode
+
+
+class OptimalSolutions:
+    """
+    Bidirectional breadth-first search that keeps, for every visited state, its depth and the
+    number of shortest paths between it and the root of its side. The optimal solutions are the
+    paths through the states where the last layers meet, so their number is the sum of the products
+    of both counts there. Iterating yields every optimal solution, built lazily from the layers.
+    Raises BudgetExceeded('depth') when no path of at most `max_path_length` moves exists but
+    the search could go on.
+    """
+
+    max_path_length = 25
+
+    def __init__(self, start: tuple[int, ...], goal: tuple[int, ...], nodes: NodeSet, fixed_areas: dict,
+                 budget: Budget | None = None, max_path_length: int | None = None):
+        if max_path_length is not None:
+            self.max_path_length = max_path_length
+        start = encode(start, fixed_areas)
+        if max(map(abs, goal)) <= MAX_PACKED_LABEL:
+            # states are single ints, see packing.py
+            start, goal = pack(start), pack(goal)
+            self.expand = nodes.packed_moves.neighbors
+        else:
+            def expand(state, reverse):
+                return neighbors(state, nodes, reverse=reverse)
+            self.expand = expand
+        self.budget = budget
+        self.depths = dict(start={start: 0}, goal={goal: 0})
+        self.counts = dict(start={start: 1}, goal={goal: 1})
+        self.meeting = [start] if start == goal else []
+        self.length = 0 if start == goal else None
+        self.count = 1 if start == goal else 0
+        self.expanded = 0
+        if start != goal:
+            self._search({'start': [start], 'goal': [goal]})
+
+    @property
+    def stats(self) -> dict:
+        return dict(length=self.length, count=self.count, expanded=self.expanded,
+                    visited=len(self.depths['start']) + len(self.depths['goal']))
+
+    def _search(self, frontiers: dict[str, list]):
+        limits = dict(start=self.max_path_length // 2 + (self.max_path_length % 2), goal=self.max_path_length // 2)
+        layers = dict(start=0, goal=0)
+        while frontiers['start'] and frontiers['goal']:
+            # the smaller frontier is the cheaper one to expand
+            side, other = ('start', 'goal') if len(frontiers['start']) <= len(frontiers['goal']) else ('goal', 'start')
+            if layers[side] >= limits[side]:
+                side, other = other, side
+                if layers[side] >= limits[side]:
+                    # both frontiers are still open, so longer solutions may exist
+                    raise BudgetExceeded('depth')
+            depths, counts = self.depths[side], self.counts[side]
+            layer = {}
+            for state in frontiers[side]:
+                self._spend(state, len(layer))
+                count = counts[state]
+                for nxt, _ in self.expand(state, reverse=side == 'goal'):
+                    if nxt in layer:
+                        layer[nxt] += count
+                    elif nxt not in depths:
+                        layer[nxt] = count
+            layers[side] += 1
+            for state, count in layer.items():
+                depths[state] = layers[side]
+                counts[state] = count
+            frontiers[side] = list(layer)
+            # The first layer that touches the other side meets exactly its last layer, every
+            # shallower meeting would have been found before.
+            other_counts = self.counts[other]
+            self.meeting = [state for state in layer if state in other_counts]
+            if self.meeting:
+                self.length = layers['start'] + layers['goal']
+                self.count = sum(layer[state] * other_counts[state] for state in self.meeting)
+                return
+
+    def _spend(self, state, pending: int):
+        # `pending` states of the layer being built are stored too
+        self.expanded += 1
+        if self.budget is not None:
+            self.budget.check(len(self.depths['start']) + len(self.depths['goal']) + pending, state)
+
+    def _paths(self, state, side: str) -> Iterator[list[tuple]]:
+        # Shortest move lists between the root of `side` and `state`, in playing order.
+        depths = self.depths[side]
+        depth = depths[state]
+        if depth == 0:
+            yield []
+            return
+        for previous, mv in self.expand(state, reverse=side == 'start'):
+            if depths.get(previous) == depth - 1:
+                for path in self._paths(previous, side):
+                    yield path + [mv] if side == 'start' else [mv] + path
+
+    def __iter__(self) -> Iterator[list[tuple]]:
+        for state in self.meeting:
+            for head in self._paths(state, 'start'):
+                for tail in self._paths(state, 'goal'):
+                    yield head + tail
+
+
+def count_solutions(board: tuple[int, ...], outline: tuple[int, ...], nodes: NodeSet,
+                    budget: Budget | None = None) -> SolveResult:
+    # The optimal length and number of optimal solutions are in the stats, with one of the
+    # solutions as the moves. A distance table gives the optimal length, so the search is not
+    # capped at OptimalSolutions.max_path_length.
+    budget = budget or Budget()
+    canonical = canonicalize(board, outline, nodes)
+    max_path_length = None
+    table = get_table(canonical.goal, canonical.nodes)
+    if table is not None:
+        max_path_length = table.distance(canonical.start)
+        if max_path_length is None:
+            return SolveResult(SolveResult.UNSOLVABLE, stats=dict(table=True, elapsed=budget.elapsed))
+    try:
+        solutions = OptimalSolutions(canonical.start, canonical.goal, canonical.nodes, {}, budget, max_path_length)
+    except BudgetExceeded as e:
+        return SolveResult(SolveResult.EXCEEDED, stats=dict(reason=e.reason, elapsed=budget.elapsed))
+    stats = dict(solutions.stats, elapsed=budget.elapsed)
+    if solutions.length is None:
+        return SolveResult(SolveResult.UNSOLVABLE, stats=stats)
+    return SolveResult(SolveResult.SOLVED, canonical.to_original(next(iter(solutions))), stats)
+
+
+def optimal_solutions(board: tuple[int, ...], outline: tuple[int, ...], nodes: NodeSet,
+                      budget: Budget | None = None) -> Iterator[Sequence[tuple]]:
+    canonical = canonicalize(board, outline, nodes)
+    for moves in OptimalSolutions(canonical.start, canonical.goal, canonical.nodes, {}, budget):
+        yield canonical.to_original(moves)
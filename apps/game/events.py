@@ -0,0 +1,137 @@
+import atexit
+import logging
+import math
+import os
+import re
+import threading
+from collections import deque
+
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from .constants import CUSTOM_GAME_STR, CUSTOM_GAME_SLUG_LENGTH
+from .models import Event
+
+GAME_INDEX_RE = re.compile(fr'\d{{1,8}}|[{CUSTOM_GAME_STR}]{{{CUSTOM_GAME_SLUG_LENGTH}}}')
+MAX_MOVES_LENGTH = 4000
+MAX_SECONDS = 7 * 24 * 60 * 60
+
+logger = logging.getLogger(__name__)
+
+
+def _seconds(value: str) -> float | None:
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        return None
+    return seconds if math.isfinite(seconds) and 0 <= seconds <= MAX_SECONDS else None
+
+
+def parse_event(data) -> Event | None:
+    # An unsaved Event from the POST data of game.coffee, None if anything is off.
+    game_index = data.get('game_index', '')
+    moves = data.get('moves', '')
+    init_time, game_time = _seconds(data.get('init_time')), _seconds(data.get('game_time'))
+    try:
+        length = int(data.get('length', ''))
+    except ValueError:
+        return None
+    if (not GAME_INDEX_RE.fullmatch(game_index) or len(moves) > MAX_MOVES_LENGTH or init_time is None or
+            game_time is None or not 0 <= length <= MAX_MOVES_LENGTH):
+        return None
+    return Event(kind=Event.SHARED if data.get('copied') == 'true' else Event.FINISHED,
+                 game_index=game_index,
+                 init_time=init_time,
+                 game_time=game_time,
+                 moves=moves,
+                 length=length,
+                 created_at=timezone.now())
+
+
+class EventBuffer:
+    """
+    Events of this process, written with one bulk insert per batch by a background thread, so
+    a request only appends to memory. The buffer is bounded: when the database falls behind,
+    new events are dropped, counted in `dropped` and logged. Whatever is left is flushed when
+    the process exits, a killed process loses at most one interval of events.
+    """
+
+    def __init__(self, maxsize: int = 10000, batch_size: int = 500, interval: float = 5.0):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.interval = interval
+        self.events: deque[Event] = deque()
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.pid = None
+
+    def add(self, event: Event):
+        with self.lock:
+            if len(self.events) >= self.maxsize:
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % self.batch_size == 0:
+                    logger.warning('Event buffer is full, %d dropped so far', self.dropped)
+                return
+            self.events.append(event)
+            if self.pid != os.getpid():
+                # first event of this process, forked workers start their own thread
+                self._start()
+            if len(self.events) >= self.batch_size:
+                self.wakeup.set()
+
+    def _start(self):
+        self.pid = os.getpid()
+        self.wakeup = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='event-buffer', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                # the events wait for the next round
+                logger.exception('Could not write %d events', len(self.events))
+
+    def flush(self) -> int:
+        with self.lock:
+            if not self.events:
+                # nothing to write, so no connection either: most processes never record an event
+                return 0
+        # the thread's connection is its own, reopen it if the database dropped it
+        close_old_connections()
+        connection.ensure_connection()
+        written = 0
+        while True:
+            with self.lock:
+                batch = [self.events.popleft() for _ in range(min(self.batch_size, len(self.events)))]
+            if not batch:
+                return written
+            try:
+                Event.objects.bulk_create(batch)
+            except Exception:
+                with self.lock:
+                    self.events.extendleft(reversed(batch))
+                raise
+            written += len(batch)
+
+
+events = EventBuffer()
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        events.flush()
+    except Exception:
+        with events.lock:
+            lost = len(events.events)
+            events.dropped += lost
+            events.events.clear()
+        logger.exception('Could not write %d events at exit', lost)
+    if events.dropped:
+        logger.warning('Event buffer dropped %d events in total', events.dropped)
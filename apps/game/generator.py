@@ -0,0 +1,102 @@
+import random
+from collections.abc import Sequence
+
+from .board import NodeSet, Rotate, get_nodes
+from .budget import Budget
+from .canonical import canonicalize
+from .counting import count_solutions
+from .utils import encode
+
+
+class Target:
+    """What a generated puzzle must look like to become a candidate."""
+
+    def __init__(self, min_length: int = 5, max_length: int = 12, max_solutions: int | None = None,
+                 disabled: int = 0, fixed: int = 0):
+        self.min_length = min_length
+        self.max_length = max_length
+        self.max_solutions = max_solutions
+        # directions of nodes to disable, a disabled rotation counts twice
+        self.disabled = disabled
+        # number of areas with a fixed colour
+        self.fixed = fixed
+
+    def accepts(self, length: int, count: int) -> bool:
+        return (self.min_length <= length <= self.max_length and
+                (self.max_solutions is None or count <= self.max_solutions))
+
+
+def area_sizes(outline: Sequence[int]) -> dict[int, int]:
+    # size of every area, numbered from 1 in order of appearance like the keys of fixed_areas
+    sizes = {}
+    numbers = {}
+    for value in outline:
+        number = numbers.setdefault(value, len(numbers) + 1)
+        sizes[number] = sizes.get(number, 0) + 1
+    return sizes
+
+
+def sample_fixed_areas(outline: Sequence[int], count: int, rng: random.Random) -> dict[int, int]:
+    sizes = area_sizes(outline)
+    areas = rng.sample(sorted(sizes), count)
+    colours = rng.sample(range(1, len(sizes) + 1), count)
+    return dict(sorted(zip(areas, colours)))
+
+
+def sample_board(outline: Sequence[int], fixed_areas: dict[int, int], rng: random.Random) -> tuple[int, ...]:
+    # Every colour fills as many cells as one area, a fixed colour as many as its own area.
+    # Shuffling that multiset draws each arrangement with the same probability.
+    sizes = area_sizes(outline)
+    free_areas = [area for area in sizes if area not in fixed_areas]
+    free_colours = [colour for colour in range(1, len(sizes) + 1) if colour not in fixed_areas.values()]
+    rng.shuffle(free_areas)
+    counts = {colour: sizes[area] for area, colour in fixed_areas.items()}
+    counts.update((colour, sizes[area]) for colour, area in zip(free_colours, free_areas))
+    board = [colour for colour, count in counts.items() for _ in range(count)]
+    rng.shuffle(board)
+    return tuple(board)
+
+
+def sample_disabled_nodes(nodes: NodeSet, count: int, rng: random.Random) -> list[list]:
+    # In the format of Game.disabled_nodes. Rotations are disabled in both directions at once,
+    # like on the create page.
+    directions = []
+    for key, node in enumerate(nodes, start=1):
+        if isinstance(node, Rotate):
+            directions.append((key, (True, True)))
+        else:
+            directions.extend([(key, (True, False)), (key, (False, True))])
+    rng.shuffle(directions)
+    disabled = {}
+    remaining = count
+    for key, (direct, reverse) in directions:
+        weight = direct + reverse
+        if weight > remaining:
+            continue
+        previous = disabled.get(key, (False, False))
+        disabled[key] = (previous[0] or direct, previous[1] or reverse)
+        remaining -= weight
+        if not remaining:
+            break
+    return [[key, direct, reverse] for key, (direct, reverse) in sorted(disabled.items())]
+
+
+def evaluate(outline: Sequence[int], rows: int, cols: int, target: Target, seed: int,
+             time_limit: float | None = None) -> dict | None:
+    # One random puzzle for `outline`, returned with its Candidate fields if `target` accepts it.
+    rng = random.Random(seed)
+    fixed_areas = sample_fixed_areas(outline, target.fixed, rng)
+    board = sample_board(outline, fixed_areas, rng)
+    disabled_nodes = sample_disabled_nodes(get_nodes(rows, cols), target.disabled, rng)
+    nodes = get_nodes(rows, cols, {key: (direct, reverse) for key, direct, reverse in disabled_nodes})
+    start, goal = encode(board, fixed_areas), encode(outline, fixed_areas, for_outline=True)
+    result = count_solutions(start, goal, nodes, Budget(max_seconds=time_limit))
+    if not result.solved or not target.accepts(result.stats['length'], result.stats['count']):
+        return None
+    return dict(board=board,
+                encoded_board=[value - 1 for value in encode(board, {})],
+                disabled_nodes=disabled_nodes,
+                fixed_areas=fixed_areas,
+                moves_min_num=result.stats['length'],
+                solutions=result.stats['count'],
+                fingerprint=canonicalize(start, goal, nodes).fingerprint)
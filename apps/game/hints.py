@@ -0,0 +1,55 @@
+from collections.abc import Sequence
+
+from .board import NodeSet
+from .canonical import canonicalize
+from .replay import Replay
+from .solutions import MISSING, solutions
+from .solver import SolveResult, neighbors
+from .tables import get_table
+from .utils import encode, relabel
+
+
+def followed_path(positions: Sequence[tuple[int, ...]], outline: tuple[int, ...], nodes: NodeSet,
+                  moves: Sequence[tuple[int, str]]) -> list[tuple] | None:
+    # Every state along an optimal solution is solved by the rest of it: the rest of the cached
+    # solution of the latest position whose moves were played since, so the one solution stored
+    # for a position serves all the hints of a player that takes them.
+    canonicals = [canonicalize(state, outline, nodes) for state in positions]
+    paths = solutions.get_many(canonicals)
+    for start in range(len(positions) - 1, -1, -1):
+        path = paths[start]
+        if path is MISSING or path is None:
+            continue
+        path = canonicals[start].to_original(path)
+        played = [tuple(mv) for mv in moves[start:]]
+        if path[:len(played)] == played:
+            return path[len(played):]
+    return None
+
+
+def hint(board: tuple[int, ...], outline: tuple[int, ...], nodes: NodeSet, fixed_areas: dict,
+         moves: Sequence[tuple[int, str]]) -> SolveResult | None:
+    # Best next move after `moves` as the only move of the result and the remaining optimal
+    # distance in stats['distance'], from a distance table or else a stored solution the player
+    # is following. None otherwise: the positions come from the client, so they are never
+    # searched or stored.
+    replay = Replay(nodes)
+    positions = [encode(board, fixed_areas)]
+    for mv in moves:
+        positions.append(relabel(replay.play(positions[-1], [mv])))
+    canonical = canonicalize(positions[-1], outline, nodes)
+    table = get_table(canonical.goal, canonical.nodes)
+    if table is not None:
+        distance = table.distance(canonical.start)
+        if distance is None:
+            return SolveResult(SolveResult.UNSOLVABLE, stats=dict(table=True))
+        best = []
+        for nxt, mv in neighbors(canonical.start, canonical.nodes):
+            if distance and table.distance(nxt) == distance - 1:
+                best = canonical.to_original([mv])
+                break
+        return SolveResult(SolveResult.SOLVED, best, dict(distance=distance, table=True))
+    path = followed_path(positions, outline, nodes, moves)
+    if path is not None:
+        return SolveResult(SolveResult.SOLVED, path[:1], dict(distance=len(path), cached=True))
+    return None
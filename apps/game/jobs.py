@@ -0,0 +1,99 @@
+import datetime
+import random
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from .board import get_nodes
+from .constants import CUSTOM_GAME_STR, CUSTOM_GAME_SLUG_LENGTH
+from .models import Custom, Outline, SolveJob
+from .budget import Budget
+from .solver import SolveResult, solve
+from .utils import encode
+
+
+def enqueue(board: tuple[int, ...], encoded_board: list[int], disabled_nodes: list, fixed_areas: dict,
+            outline: Outline, fingerprint: str) -> SolveJob:
+    # A puzzle submitted again while its job is still queued or running shares that job.
+    job = SolveJob.objects.filter(fingerprint=fingerprint,
+                                  status__in=(SolveJob.PENDING, SolveJob.RUNNING)).first()
+    if job is None:
+        job = SolveJob.objects.create(board=board,
+                                      encoded_board=encoded_board,
+                                      disabled_nodes=disabled_nodes,
+                                      fixed_areas=fixed_areas,
+                                      outline=outline,
+                                      fingerprint=fingerprint)
+    return job
+
+
+def claim() -> SolveJob | None:
+    # The conditional update makes sure that two workers never take the same job.
+    while True:
+        job = SolveJob.objects.filter(status=SolveJob.PENDING).order_by('created_at').first()
+        if job is None:
+            return None
+        claimed = SolveJob.objects.filter(pk=job.pk, status=SolveJob.PENDING).update(
+            status=SolveJob.RUNNING, started_at=timezone.now())
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def finish(job: SolveJob, custom: Custom | None = None, error: str = ''):
+    job.custom = custom
+    job.error = error
+    job.status = SolveJob.FAILED if error else SolveJob.DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=('custom', 'error', 'status', 'finished_at'))
+
+
+def run(job: SolveJob, budget: Budget | None = None):
+    game = Custom.objects.filter(fingerprint=job.fingerprint).first()
+    if game is not None:
+        return finish(job, game)
+    fixed_areas = {int(k): v for k, v in job.fixed_areas.items()}
+    game = Custom(board=job.board,
+                  disabled_nodes=job.disabled_nodes,
+                  fixed_areas=fixed_areas,
+                  outline=job.outline,
+                  encoded_board=job.encoded_board,
+                  fingerprint=job.fingerprint,
+                  index=''.join(random.choices(CUSTOM_GAME_STR, k=CUSTOM_GAME_SLUG_LENGTH)))
+    result = solve(board=encode(job.board, fixed_areas),
+                   outline=encode(job.outline.board, fixed_areas, for_outline=True),
+                   nodes=get_nodes(job.outline.rows, job.outline.cols, game.disabled_nodes_as_dict),
+                   fixed_areas=fixed_areas,
+                   budget=budget)
+    if result.status == SolveResult.EXCEEDED:
+        return finish(job, error='The puzzle is too hard to verify.')
+    if not result.solved:
+        return finish(job, error='The puzzle is unsolvable.')
+    n = len(result.moves)
+    if n == 0:
+        return finish(job, error='The puzzle is already solved.')
+    game.moves_min_num = n
+    try:
+        with transaction.atomic():
+            game.save()
+    except IntegrityError:
+        # the same puzzle was solved by another job
+        game = Custom.objects.get(fingerprint=job.fingerprint)
+    finish(job, game)
+
+
+def fail_stale(seconds: float) -> int:
+    # Jobs of workers that died while solving would otherwise stay running forever.
+    started = timezone.now() - datetime.timedelta(seconds=seconds)
+    return SolveJob.objects.filter(status=SolveJob.RUNNING, started_at__lt=started).update(
+        status=SolveJob.FAILED, error='The puzzle took too long to solve.', finished_at=timezone.now())
+
+
+def job_response(job: SolveJob) -> dict:
+    if job.status == SolveJob.DONE and job.custom is not None:
+        return {'url': settings.SITE_DOMAIN + reverse('custom', args=(job.custom.index,))}
+    if job.status != SolveJob.PENDING and job.status != SolveJob.RUNNING:
+        return {'error': job.error or 'The puzzle could not be solved.'}
+    return {'job': job.pk, 'status': job.status, 'status_url': reverse('solve-job', args=(job.pk,))}
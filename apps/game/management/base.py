@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.game.models import Daily, Custom
+
+
+class GamesCommand(BaseCommand):
+    """A command over the daily and custom puzzles chosen with --daily and --custom, all of them by default."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--daily', type=int, action='append', default=[], help='Daily puzzle index.')
+        parser.add_argument('--custom', action='append', default=[], help='Custom puzzle slug.')
+
+    def get_games(self, options):
+        if not options['daily'] and not options['custom']:
+            yield from Daily.objects.select_related('outline')
+            yield from Custom.objects.select_related('outline')
+        else:
+            yield from Daily.objects.select_related('outline').filter(index__in=options['daily'])
+            yield from Custom.objects.select_related('outline').filter(index__in=options['custom'])
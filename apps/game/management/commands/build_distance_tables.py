@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+
+from apps.game.board import get_nodes
+from apps.game.canonical import canonicalize
+from apps.game.management.base import GamesCommand
+from apps.game.solver import build_distance_table
+from apps.game.tables import DistanceTable, table_path
+from apps.game.utils import encode
+
+
+class Command(GamesCommand):
+    help = 'Build the optimal-distance tables used by the solver for daily and custom puzzles.'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--force', action='store_true', help='Rebuild existing tables.')
+
+    def handle(self, *args, **options):
+        settings.DISTANCE_TABLES_DIR.mkdir(parents=True, exist_ok=True)
+        built = set()
+        for game in self.get_games(options):
+            fixed_areas = game.fixed_areas_as_int
+            canonical = canonicalize(encode(game.board, fixed_areas),
+                                     encode(game.outline.board, fixed_areas, for_outline=True),
+                                     get_nodes(game.outline.rows, game.outline.cols, game.disabled_nodes_as_dict))
+            goal, nodes = canonical.goal, canonical.nodes
+            path = table_path(goal, nodes)
+            if path.stem in built or (path.exists() and not options['force']):
+                continue
+            start = time.monotonic()
+            table = build_distance_table(goal, nodes, {})
+            DistanceTable.write(path, table)
+            built.add(path.stem)
+            self.stdout.write(f'{game.__class__.__name__} {game.index}: {path.name}, '
+                              f'{len(table)} states in {time.monotonic() - start:.1f}s')
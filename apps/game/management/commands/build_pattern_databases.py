@@ -0,0 +1,27 @@
+import time
+
+from django.conf import settings
+
+from apps.game.board import get_nodes
+from apps.game.canonical import canonicalize
+from apps.game.management.base import GamesCommand
+from apps.game.patterns import default_patterns, get_database
+from apps.game.utils import encode
+
+
+class Command(GamesCommand):
+    help = 'Build the pattern databases used by the IDA* heuristic for daily and custom puzzles.'
+
+    def handle(self, *args, **options):
+        settings.DISTANCE_TABLES_DIR.mkdir(parents=True, exist_ok=True)
+        for game in self.get_games(options):
+            fixed_areas = game.fixed_areas_as_int
+            canonical = canonicalize(encode(game.board, fixed_areas),
+                                     encode(game.outline.board, fixed_areas, for_outline=True),
+                                     get_nodes(game.outline.rows, game.outline.cols, game.disabled_nodes_as_dict))
+            goal, nodes = canonical.goal, canonical.nodes
+            for pattern in default_patterns(goal):
+                start = time.monotonic()
+                database = get_database(goal, nodes, pattern, build=True)
+                self.stdout.write(f'{game.__class__.__name__} {game.index}: pattern {pattern}, '
+                                  f'{database.size} states in {time.monotonic() - start:.1f}s')
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.game.board import get_nodes
+from apps.game.models import Daily, Custom
+from apps.game.solver import bfs, ida_star
+from apps.game.utils import encode
+
+
+class Command(BaseCommand):
+    help = 'Solve the stored daily and custom puzzles with bfs and IDA* and compare length and time.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='Number of puzzles of each kind.')
+
+    def handle(self, *args, **options):
+        totals = dict(bfs=0.0, ida=0.0)
+        mismatches = 0
+        for model_class in (Daily, Custom):
+            for game in model_class.objects.select_related('outline').order_by('pk')[:options['limit']]:
+                fixed_areas = game.fixed_areas_as_int
+                board = encode(game.board, fixed_areas)
+                outline = encode(game.outline.board, fixed_areas, for_outline=True)
+                nodes = get_nodes(game.outline.rows, game.outline.cols, game.disabled_nodes_as_dict)
+                results = {}
+                for name, method in (('bfs', bfs), ('ida', ida_star)):
+                    stats = {}
+                    start = time.monotonic()
+                    solution = method(board, outline, nodes, fixed_areas, stats=stats)
+                    elapsed = time.monotonic() - start
+                    totals[name] += elapsed
+                    results[name] = (None if solution is None else len(solution), elapsed, stats)
+                if results['bfs'][0] != results['ida'][0]:
+                    mismatches += 1
+                self.stdout.write(
+                    f'{model_class.__name__} {game.index} (min {game.moves_min_num}): ' +
+                    ', '.join(f'{name} {length} moves in {elapsed:.2f}s {stats}'
+                              for name, (length, elapsed, stats) in results.items()))
+        self.stdout.write(f'Total: bfs {totals["bfs"]:.2f}s, ida {totals["ida"]:.2f}s, {mismatches} mismatches')
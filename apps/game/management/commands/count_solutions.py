@@ -0,0 +1,29 @@
+from apps.game.board import get_nodes
+from apps.game.budget import Budget
+from apps.game.counting import count_solutions
+from apps.game.management.base import GamesCommand
+from apps.game.utils import encode
+
+
+class Command(GamesCommand):
+    help = 'Print the optimal length and the number of optimal solutions of daily and custom puzzles.'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--time-limit', type=int, default=None, help='Seconds per puzzle.')
+
+    def handle(self, *args, **options):
+        for game in self.get_games(options):
+            fixed_areas = game.fixed_areas_as_int
+            result = count_solutions(encode(game.board, fixed_areas),
+                                     encode(game.outline.board, fixed_areas, for_outline=True),
+                                     get_nodes(game.outline.rows, game.outline.cols, game.disabled_nodes_as_dict),
+                                     Budget(max_seconds=options['time_limit']))
+            name = f'{game.__class__.__name__} {game.index}'
+            if result.solved:
+                self.stdout.write(f'{name}: {result.stats["count"]} solutions of {result.stats["length"]} moves '
+                                  f'in {result.stats["elapsed"]:.2f}s')
+            elif result.status == result.EXCEEDED:
+                self.stdout.write(f'{name}: {result.status} ({result.stats["reason"]})')
+            else:
+                self.stdout.write(f'{name}: {result.status}')
@@ -0,0 +1,56 @@
+import multiprocessing
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.game.generator import Target, evaluate
+from apps.game.models import Candidate, Outline
+
+
+class Command(BaseCommand):
+    help = 'Generate random puzzles per outline and keep those matching the target as ranked daily candidates.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--outline', type=int, action='append', default=[], help='Outline index.')
+        parser.add_argument('--count', type=int, default=10, help='Candidates to add per outline.')
+        parser.add_argument('--attempts', type=int, default=1000, help='Random puzzles tried per outline.')
+        parser.add_argument('--min-length', type=int, default=5)
+        parser.add_argument('--max-length', type=int, default=12)
+        parser.add_argument('--max-solutions', type=int, default=None)
+        parser.add_argument('--disabled', type=int, default=0, help='Disabled node directions per puzzle.')
+        parser.add_argument('--fixed', type=int, default=0, help='Fixed areas per puzzle.')
+        parser.add_argument('--processes', type=int, default=multiprocessing.cpu_count())
+        parser.add_argument('--time-limit', type=int, default=30, help='Seconds per puzzle.')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        target = Target(options['min_length'], options['max_length'], options['max_solutions'],
+                        options['disabled'], options['fixed'])
+        outlines = Outline.objects.order_by('index')
+        if options['outline']:
+            outlines = outlines.filter(index__in=options['outline'])
+        rng = random.Random(options['seed'])
+        context = multiprocessing.get_context('fork')
+        for outline in outlines:
+            tasks = [(outline.board, outline.rows, outline.cols, target, rng.getrandbits(64), options['time_limit'])
+                     for _ in range(options['attempts'])]
+            added = 0
+            # forked workers must not share the connection of this process
+            connections.close_all()
+            # leaving the block terminates the attempts still queued once enough were added
+            with context.Pool(options['processes']) as pool:
+                for fields in pool.imap_unordered(_evaluate, tasks):
+                    if fields is None:
+                        continue
+                    fingerprint = fields.pop('fingerprint')
+                    _, created = Candidate.objects.get_or_create(fingerprint=fingerprint,
+                                                                 defaults=dict(fields, outline=outline))
+                    added += created
+                    if added == options['count']:
+                        break
+            self.stdout.write(f'Outline {outline.index}: {added} candidates added')
+
+
+def _evaluate(task):
+    return evaluate(*task)
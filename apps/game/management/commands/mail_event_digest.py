@@ -0,0 +1,43 @@
+import datetime
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Min
+from django.utils import timezone
+
+from apps.game.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Mail the admins a summary of the finished and shared games of the last hours.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24)
+        parser.add_argument('--dry-run', action='store_true', help='Print the digest instead of mailing it.')
+
+    def handle(self, *args, **options):
+        since = timezone.now() - datetime.timedelta(hours=options['hours'])
+        games = {}
+        rows = (Event.objects.filter(created_at__gte=since)
+                .values('game_index', 'kind')
+                .annotate(count=Count('id'), shortest=Min('length'), average=Avg('length'), time=Avg('game_time')))
+        for row in rows:
+            games.setdefault(row['game_index'], {})[row['kind']] = row
+        if not games:
+            self.stdout.write('No events')
+            return
+        lines = [f'{sum(row["count"] for game in games.values() for row in game.values())} events in the last '
+                 f'{options["hours"]} hours', '']
+        for game_index, kinds in sorted(games.items(), key=lambda item: (not item[0].isdigit(), item[0])):
+            finished, shared = kinds.get(Event.FINISHED), kinds.get(Event.SHARED)
+            line = f'#{game_index}: {finished["count"] if finished else 0} finished, {shared["count"] if shared else 0} shared'
+            if finished:
+                line += (f', shortest {finished["shortest"]} moves, average {finished["average"]:.1f} moves '
+                         f'in {finished["time"]:.0f}s')
+            lines.append(line)
+        digest = '\n'.join(lines)
+        if options['dry_run']:
+            self.stdout.write(digest)
+        else:
+            send_mail('Rotatly digest', digest, None, [a[1] for a in settings.ADMINS])
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.game.caching import CountingCache, hit_counter, page_cache
+
+
+class Command(BaseCommand):
+    help = 'Print the hits and misses of the page cache per kind of HTML, across all workers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Start counting from zero.')
+        parser.add_argument('--clear', action='store_true', help='Drop the cached pages and fragments.')
+
+    def handle(self, *args, **options):
+        cache = page_cache()
+        if not isinstance(cache, CountingCache):
+            raise CommandError('The pages cache does not count hits, see CACHES in the settings.')
+        for kind, counters in hit_counter.stats().items():
+            total = counters['hits'] + counters['misses']
+            ratio = f'{counters["hits"] / total:.1%}' if total else '-'
+            self.stdout.write(f'{kind:<8} {counters["hits"]:>8} hits {counters["misses"]:>8} misses {ratio:>7}')
+        if options['clear']:
+            cache.clear()
+        if options['reset']:
+            hit_counter.reset()
@@ -0,0 +1,52 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.urls import reverse
+
+from apps.game.caching import page_version
+from apps.game.constants import START_DATE
+from apps.game.models import Daily, RenderedDaily
+from apps.game.views import DailyView, today
+
+
+class DailyOnView(DailyView):
+    # DailyView as it renders on `day`
+    day = None
+
+    def get_today(self) -> datetime.datetime:
+        return self.day
+
+    def get_page(self, request, *args, **kwargs):
+        # a fresh render, not the stored page
+        return super(DailyView, self).get_page(request, *args, **kwargs)
+
+
+class Command(BaseCommand):
+    help = ('Render the daily page of today and the next days, so DailyView serves stored HTML. '
+            'Run it before every day boundary and after a deploy or a change to a daily puzzle.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help='Days after today to render.')
+        parser.add_argument('--force', action='store_true', help='Render pages that are already stored.')
+
+    def handle(self, *args, **options):
+        first = today()
+        first_index = (first - START_DATE).days
+        RenderedDaily.objects.filter(index__lt=first_index).delete()
+        version = page_version()[0]
+        stored = set(RenderedDaily.objects.filter(version=version).values_list('index', flat=True))
+        available = set(Daily.objects.filter(index__gte=first_index).values_list('index', flat=True))
+        request = RequestFactory().get(reverse('daily'))
+        for offset in range(options['days'] + 1):
+            day = first + datetime.timedelta(days=offset)
+            index = first_index + offset
+            if index not in available:
+                self.stdout.write(f'No daily puzzle #{index} for {day:%Y-%m-%d}')
+                continue
+            if index in stored and not options['force']:
+                continue
+            response = DailyOnView.as_view(day=day)(request)
+            RenderedDaily.objects.update_or_create(
+                index=index, defaults={'html': response.render().content.decode(), 'version': version})
+            self.stdout.write(f'Rendered daily puzzle #{index} for {day:%Y-%m-%d}')
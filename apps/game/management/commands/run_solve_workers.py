@@ -0,0 +1,81 @@
+import multiprocessing
+import resource
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.game.budget import Budget
+from apps.game.jobs import claim, fail_stale, finish, run
+
+
+class TimeLimitExceeded(Exception):
+    pass
+
+
+def _alarm(signum, frame):
+    raise TimeLimitExceeded
+
+
+def work(time_limit: int, memory_limit: int, poll: float, once: bool):
+    # Searches stop at the job budget. The alarm and the address space limit only catch
+    # what the budget does not account for, and a job that hits them fails alone.
+    limit = memory_limit * 1024 * 1024
+    if memory_limit:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    signal.signal(signal.SIGALRM, _alarm)
+    while True:
+        job = claim()
+        if job is None:
+            if once:
+                return
+            time.sleep(poll)
+            continue
+        signal.alarm(2 * time_limit)
+        try:
+            run(job, Budget(max_seconds=time_limit, max_bytes=limit // 2 or None))
+        except TimeLimitExceeded:
+            finish(job, error='The puzzle took too long to solve.')
+        except MemoryError:
+            finish(job, error='The puzzle needs too much memory to solve.')
+        finally:
+            signal.alarm(0)
+
+
+class Command(BaseCommand):
+    help = 'Solve queued custom puzzles in a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=2)
+        parser.add_argument('--time-limit', type=int, default=60, help='seconds per job')
+        parser.add_argument('--memory-limit', type=int, default=1024, help='megabytes per worker, 0 for none')
+        parser.add_argument('--poll', type=float, default=1.0, help='seconds between queue checks')
+        parser.add_argument('--once', action='store_true', help='exit when the queue is empty')
+
+    def handle(self, *args, **options):
+        work_args = (options['time_limit'], options['memory_limit'], options['poll'], options['once'])
+        context = multiprocessing.get_context('fork')
+        # forked workers must not share the connection of this process
+        connections.close_all()
+        workers = [context.Process(target=work, args=work_args) for _ in range(options['processes'])]
+        for worker in workers:
+            worker.start()
+        try:
+            while any(worker.is_alive() for worker in workers):
+                failed = fail_stale(3 * options['time_limit'])
+                if failed:
+                    self.stdout.write(f'{failed} stale jobs failed')
+                for i, worker in enumerate(workers):
+                    if not worker.is_alive() and worker.exitcode and not options['once']:
+                        # killed by the OS, e.g. out of memory
+                        self.stdout.write(f'worker {worker.pid} exited with {worker.exitcode}, restarting')
+                        connections.close_all()
+                        workers[i] = context.Process(target=work, args=work_args)
+                        workers[i].start()
+                time.sleep(options['poll'])
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
+        for worker in workers:
+            worker.join()
@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-18 13:14
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def custom_fingerprint(board, disabled_nodes, fixed_areas, outline_id):
+    # a copy of apps.game.utils.custom_fingerprint as of this migration
+    normalised = (tuple(int(c) for c in board),
+                  tuple(sorted((int(k), bool(d), bool(r)) for k, d, r in disabled_nodes)),
+                  tuple(sorted((int(k), int(v)) for k, v in fixed_areas.items())),
+                  int(outline_id))
+    return hashlib.sha256(repr(normalised).encode()).hexdigest()
+
+
+def fill_fingerprints(apps, schema_editor):
+    # The oldest of a set of duplicates keeps the fingerprint, later copies stay null.
+    Custom = apps.get_model('game', 'Custom')
+    seen = set()
+    for game in Custom.objects.order_by('pk').only('pk', 'board', 'disabled_nodes', 'fixed_areas', 'outline_id'):
+        fingerprint = custom_fingerprint(game.board, game.disabled_nodes, game.fixed_areas, game.outline_id)
+        if fingerprint not in seen:
+            seen.add(fingerprint)
+            Custom.objects.filter(pk=game.pk).update(fingerprint=fingerprint)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0002_solution'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='custom',
+            name='fingerprint',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+        migrations.RunPython(fill_fingerprints, migrations.RunPython.noop),
+    ]
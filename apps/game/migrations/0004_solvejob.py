@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-18 13:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0003_custom_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SolveJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'pending'), ('running', 'running'), ('done', 'done'), ('failed', 'failed')], default='pending', max_length=8)),
+                ('board', models.JSONField()),
+                ('encoded_board', models.JSONField()),
+                ('disabled_nodes', models.JSONField(blank=True, default=list)),
+                ('fixed_areas', models.JSONField(blank=True, default=dict)),
+                ('fingerprint', models.CharField(db_index=True, max_length=64)),
+                ('error', models.CharField(blank=True, max_length=128)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('custom', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='game.custom')),
+                ('outline', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='game.outline')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='game_solvej_status_cb0bd0_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0 on 2026-10-18 13:27
+
+import math
+
+from django.db import migrations, models
+
+
+def fill_dimensions(apps, schema_editor):
+    # every outline so far is square
+    Outline = apps.get_model('game', 'Outline')
+    for outline in Outline.objects.only('pk', 'board'):
+        size = int(math.sqrt(len(outline.board)))
+        Outline.objects.filter(pk=outline.pk).update(rows=size, cols=size)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0004_solvejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outline',
+            name='cols',
+            field=models.PositiveSmallIntegerField(default=4),
+        ),
+        migrations.AddField(
+            model_name='outline',
+            name='rows',
+            field=models.PositiveSmallIntegerField(default=4),
+        ),
+        migrations.RunPython(fill_dimensions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-18 13:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0005_outline_dimensions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Candidate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.JSONField()),
+                ('encoded_board', models.JSONField()),
+                ('moves_min_num', models.PositiveIntegerField()),
+                ('disabled_nodes', models.JSONField(blank=True, default=dict)),
+                ('fixed_areas', models.JSONField(blank=True, default=dict)),
+                ('solutions', models.PositiveIntegerField()),
+                ('fingerprint', models.CharField(max_length=64, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('outline', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='game.outline')),
+            ],
+            options={
+                'ordering': ('outline', 'solutions', '-moves_min_num'),
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0 on 2026-10-18 13:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0006_candidate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RenderedDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveIntegerField(unique=True)),
+                ('html', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
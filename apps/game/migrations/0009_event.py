@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-18 17:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0008_game_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Event',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('finished', 'finished'), ('shared', 'shared')], max_length=8)),
+                ('game_index', models.CharField(max_length=8)),
+                ('init_time', models.FloatField()),
+                ('game_time', models.FloatField()),
+                ('moves', models.TextField(blank=True)),
+                ('length', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at'], name='game_event_created_e780cf_idx')],
+            },
+        ),
+    ]
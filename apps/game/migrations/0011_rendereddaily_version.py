@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0010_pagecachecounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rendereddaily',
+            name='version',
+            field=models.CharField(default='', max_length=64),
+        ),
+    ]
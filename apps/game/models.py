@@ -5,6 +5,8 @@ from django.utils.functional import cached_property
 class Outline(models.Model):
     index = models.PositiveIntegerField()
     board = models.JSONField()
+    rows = models.PositiveSmallIntegerField(default=4)
+    cols = models.PositiveSmallIntegerField(default=4)
 
 
 class Game(models.Model):
@@ -14,6 +16,8 @@ class Game(models.Model):
     disabled_nodes = models.JSONField(default=dict, blank=True)
     outline = models.ForeignKey(Outline, on_delete=models.CASCADE)
     fixed_areas = models.JSONField(default=dict, blank=True)
+    # Last-Modified of the puzzle page
+    updated_at = models.DateTimeField(auto_now=True)
 
     @cached_property
     def disabled_nodes_as_dict(self):
@@ -33,3 +37,84 @@ class Daily(Game):
 
 class Custom(Game):
     index = models.CharField(max_length=8, db_index=True)
+    # utils.custom_fingerprint of the puzzle, null only for duplicates created before it existed
+    fingerprint = models.CharField(max_length=64, unique=True, null=True, blank=True)
+
+
+class RenderedDaily(models.Model):
+    # the page of the daily puzzle `index` on its own day, see prerender_dailies
+    index = models.PositiveIntegerField(unique=True)
+    html = models.TextField()
+    # caching.page_version() the page was rendered with, other versions are rendered again
+    version = models.CharField(max_length=64, default='')
+    created_at = models.DateTimeField(auto_now=True)
+
+
+class Candidate(Game):
+    # generated puzzles that could become dailies, best first, see generator.py
+    solutions = models.PositiveIntegerField()
+    # canonical.Canonical.fingerprint, so symmetric duplicates are kept once
+    fingerprint = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ('outline', 'solutions', '-moves_min_num')
+
+
+class Solution(models.Model):
+    # sha256 of a canonical puzzle, see canonical.Canonical.fingerprint
+    fingerprint = models.CharField(max_length=64, unique=True)
+    # optimal moves in the canonical frame, null for unsolvable puzzles
+    moves = models.JSONField(null=True)
+
+
+class SolveJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(s, s) for s in (PENDING, RUNNING, DONE, FAILED)]
+
+    status = models.CharField(max_length=8, choices=STATUS_CHOICES, default=PENDING)
+    # the validated custom puzzle, saved as a Custom once it is solved
+    board = models.JSONField()
+    encoded_board = models.JSONField()
+    disabled_nodes = models.JSONField(default=list, blank=True)
+    fixed_areas = models.JSONField(default=dict, blank=True)
+    outline = models.ForeignKey(Outline, on_delete=models.CASCADE)
+    fingerprint = models.CharField(max_length=64, db_index=True)
+    custom = models.ForeignKey(Custom, null=True, blank=True, on_delete=models.SET_NULL)
+    error = models.CharField(max_length=128, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+
+class Event(models.Model):
+    # a finished or shared game, posted to the track view, see events.py
+    FINISHED = 'finished'
+    SHARED = 'shared'
+    KIND_CHOICES = [(k, k) for k in (FINISHED, SHARED)]
+
+    kind = models.CharField(max_length=8, choices=KIND_CHOICES)
+    # Daily.index or Custom.index
+    game_index = models.CharField(max_length=8)
+    # seconds from the page load to the first move and from there to the end of the game
+    init_time = models.FloatField()
+    game_time = models.FloatField()
+    moves = models.TextField(blank=True)
+    length = models.PositiveIntegerField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [models.Index(fields=['created_at'])]
+
+
+class PageCacheCounter(models.Model):
+    # hits and misses of the pages cache summed over all workers, see caching.HitCounter
+    kind = models.CharField(max_length=8, unique=True)
+    hits = models.BigIntegerField(default=0)
+    misses = models.BigIntegerField(default=0)
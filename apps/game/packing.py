@@ -0,0 +1,111 @@
+from collections.abc import Iterable, Sequence
+
+BITS = 4
+MASK = (1 << BITS) - 1
+SIGN = 1 << (BITS - 1)
+MAX_PACKED_LABEL = SIGN - 1
+CHUNK_CELLS = 4
+CHUNK_BITS = BITS * CHUNK_CELLS
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+
+def pack(state: Sequence[int]) -> int:
+    # Labels are stored as 4-bit two's complement, so fixed areas (-1..-8) and groups (1..7) fit in a nibble.
+    packed = 0
+    for i, value in enumerate(state):
+        packed |= (value & MASK) << (BITS * i)
+    return packed
+
+
+def unpack(packed: int, cells: int) -> tuple[int, ...]:
+    state = []
+    for i in range(cells):
+        value = (packed >> (BITS * i)) & MASK
+        state.append(value - (1 << BITS) if value & SIGN else value)
+    return tuple(state)
+
+
+def compile_permutation(permutation: Sequence[int]) -> tuple[int, tuple[tuple[int, int], ...]]:
+    # Cells that move by the same distance are moved together with one mask and one shift.
+    keep = 0
+    groups = {}
+    for target, source in enumerate(permutation):
+        if target == source:
+            keep |= MASK << (BITS * target)
+        else:
+            shift = BITS * (target - source)
+            groups[shift] = groups.get(shift, 0) | (MASK << (BITS * source))
+    return keep, tuple((mask, shift) for shift, mask in groups.items())
+
+
+def apply_permutation(packed: int, keep: int, groups: tuple[tuple[int, int], ...]) -> int:
+    result = packed & keep
+    for mask, shift in groups:
+        if shift > 0:
+            result |= (packed & mask) << shift
+        else:
+            result |= (packed & mask) >> -shift
+    return result
+
+
+class Relabeler:
+    """
+    Packed counterpart of `utils.encode` for states that are already encoded: fixed areas are kept,
+    the other groups are renumbered by first appearance. The state is consumed 16 bits at a time
+    through a memoised transition table keyed by the labels seen so far.
+    """
+
+    def __init__(self, cells: int):
+        self.chunks = -(-cells // CHUNK_CELLS)
+        self._seen_ids = {(): 0}
+        self._seen = [()]
+        self._steps = {}
+
+    def _step(self, key: int) -> tuple[int, int]:
+        seen = list(self._seen[key >> CHUNK_BITS])
+        chunk = key & CHUNK_MASK
+        relabelled = 0
+        for i in range(CHUNK_CELLS):
+            value = (chunk >> (BITS * i)) & MASK
+            if value:
+                if value not in seen:
+                    seen.append(value)
+                if not value & SIGN:
+                    value = seen.index(value) + 1
+            relabelled |= value << (BITS * i)
+        seen = tuple(seen)
+        seen_id = self._seen_ids.get(seen)
+        if seen_id is None:
+            seen_id = self._seen_ids[seen] = len(self._seen)
+            self._seen.append(seen)
+        step = self._steps[key] = (seen_id, relabelled)
+        return step
+
+    def __call__(self, packed: int) -> int:
+        steps = self._steps
+        seen_id = 0
+        result = 0
+        for i in range(self.chunks):
+            key = (seen_id << CHUNK_BITS) | ((packed >> (CHUNK_BITS * i)) & CHUNK_MASK)
+            step = steps.get(key)
+            if step is None:
+                step = self._step(key)
+            seen_id, relabelled = step
+            result |= relabelled << (CHUNK_BITS * i)
+        return result
+
+
+class PackedMoveSet:
+    """The moves of a `board.MoveSet` as mask-and-shift programs over packed states."""
+
+    def __init__(self, forward_permutations: Iterable[tuple[Sequence[int], tuple[int, str]]],
+                 backward_permutations: Iterable[tuple[Sequence[int], tuple[int, str]]], cells: int):
+        self.cells = cells
+        self.forward = [(*compile_permutation(permutation), mv) for permutation, mv in forward_permutations]
+        self.backward = [(*compile_permutation(permutation), mv) for permutation, mv in backward_permutations]
+        self.relabel = Relabeler(cells)
+
+    def neighbors(self, state: int, reverse: bool = False) -> Iterable[tuple[int, tuple[int, str]]]:
+        relabel = self.relabel
+        for keep, groups, mv in (self.backward if reverse else self.forward):
+            yield relabel(apply_permutation(state, keep, groups)), mv
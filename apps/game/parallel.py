@@ -0,0 +1,228 @@
+import multiprocessing
+import os
+from collections.abc import Sequence
+from contextlib import contextmanager
+
+from .board import NodeSet
+from .budget import Budget, BudgetExceeded
+from .packing import pack
+from .utils import search_limits
+from .vectorized import STATE_BYTES, LayerExpander, contains, np, permutations, unique
+
+SIDES = ('start', 'goal')
+# Fibonacci hashing spreads the packed states evenly over the partitions
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+class WorkerDied(RuntimeError):
+    pass
+
+
+def owners(states: 'np.ndarray', partitions: int) -> 'np.ndarray':
+    hashed = states * np.uint64(HASH_MULTIPLIER) >> np.uint64(32)
+    return (hashed % np.uint64(partitions)).astype(np.intp)
+
+
+def _send_array(conn, array: 'np.ndarray'):
+    conn.send_bytes(array.tobytes())
+
+
+def _recv_array(conn) -> 'np.ndarray':
+    return np.frombuffer(conn.recv_bytes(), dtype=np.uint64)
+
+
+def _worker(conn, partition: int, partitions: int, goal: Sequence[int],
+            forward: Sequence[Sequence[int]], backward: Sequence[Sequence[int]]):
+    # Owns the states of one hash partition of both searches: their layers, visited arrays
+    # and deduplication. Commands and packed state buffers arrive over `conn`.
+    expander = LayerExpander(goal, forward, backward)
+    layers = {side: [] for side in SIDES}
+    visited = {side: np.zeros(0, dtype=np.uint64) for side in SIDES}
+    while True:
+        command, *args = conn.recv()
+        if command == 'seed':
+            side, = args
+            layer = _recv_array(conn)
+            layers[side].append(layer)
+            visited[side] = layer
+        elif command == 'expand':
+            # neighbours of the last layer, one buffer per owning partition
+            side, = args
+            candidates = expander.expand(layers[side][-1], reverse=side == 'goal')
+            targets = owners(candidates, partitions)
+            for target in range(partitions):
+                _send_array(conn, candidates[targets == target])
+        elif command == 'merge':
+            # new layer of this partition from the buffers of all partitions, then its meeting
+            # with the other search as (depth on the other side, state), or None
+            side, other = args
+            candidates = unique(np.concatenate([_recv_array(conn) for _ in range(partitions)]))
+            layer = candidates[~contains(visited[side], candidates)]
+            layers[side].append(layer)
+            visited[side] = np.sort(np.concatenate((visited[side], layer)))
+            meeting = None
+            found = np.intersect1d(layer, visited[other], assume_unique=True)
+            if len(found):
+                for depth, other_layer in enumerate(layers[other]):
+                    in_layer = found[contains(other_layer, found)]
+                    if len(in_layer):
+                        meeting = depth, int(in_layer[0])
+                        break
+            conn.send((len(layer), len(visited[side]), meeting))
+        elif command == 'contains':
+            side, depth = args
+            _send_array(conn, contains(layers[side][depth], _recv_array(conn)).astype(np.uint64))
+        elif command == 'stop':
+            conn.close()
+            return
+
+
+class ParallelSearch:
+    """A pool of partition workers for one bidirectional search, see `parallel_bfs`."""
+
+    def __init__(self, goal: Sequence[int], nodes: NodeSet, workers: int):
+        context = multiprocessing.get_context()
+        forward, backward = permutations(nodes)
+        self.connections = []
+        self.processes = []
+        for partition in range(workers):
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, args=(child, partition, workers, goal, forward, backward),
+                                      daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    @contextmanager
+    def exchange(self):
+        # a worker that died leaves a closed pipe behind, report it instead of the pipe error
+        try:
+            yield
+        except (EOFError, OSError) as e:
+            codes = [process.exitcode for process in self.processes if not process.is_alive()]
+            raise WorkerDied(f'A search worker exited with {codes or "a closed pipe"}.') from e
+
+    def seed(self, side: str, state: int):
+        layer = np.array([state], dtype=np.uint64)
+        targets = owners(layer, len(self.connections))
+        with self.exchange():
+            for partition, conn in enumerate(self.connections):
+                conn.send(('seed', side))
+                _send_array(conn, layer[targets == partition])
+
+    def step(self, side: str, other: str) -> tuple[int, int, tuple[int, int] | None]:
+        # Expands the last layer of `side` everywhere, routes every neighbour to its owner and
+        # returns the size of the new layer, the visited states of `side` and the best meeting.
+        with self.exchange():
+            for conn in self.connections:
+                conn.send(('expand', side))
+            buffers = [[conn.recv_bytes() for _ in self.connections] for conn in self.connections]
+            for partition, conn in enumerate(self.connections):
+                conn.send(('merge', side, other))
+                for source in buffers:
+                    conn.send_bytes(source[partition])
+            results = [conn.recv() for conn in self.connections]
+        layer_size = visited = 0
+        best = None
+        for size, count, meeting in results:
+            layer_size += size
+            visited += count
+            if meeting is not None and (best is None or meeting < best):
+                best = meeting
+        return layer_size, visited, best
+
+    def contains(self, side: str, depth: int, states: Sequence[int]) -> list[bool]:
+        states = np.array(states, dtype=np.uint64)
+        targets = owners(states, len(self.connections))
+        result = np.zeros(len(states), dtype=bool)
+        with self.exchange():
+            for partition, conn in enumerate(self.connections):
+                conn.send(('contains', side, depth))
+                _send_array(conn, states[targets == partition])
+            for partition, conn in enumerate(self.connections):
+                result[targets == partition] = _recv_array(conn).astype(bool)
+        return result.tolist()
+
+    def trace(self, state: int, depth: int, side: str, nodes: NodeSet) -> list[tuple]:
+        # Walks from a state at `depth` of one search back to its root, one move per layer.
+        path = []
+        for previous in range(depth - 1, -1, -1):
+            neighbors = list(nodes.packed_moves.neighbors(state, reverse=side == 'start'))
+            found = self.contains(side, previous, [neighbor for neighbor, _ in neighbors])
+            state, mv = neighbors[found.index(True)]
+            path.append(mv)
+        return path
+
+    def close(self):
+        for conn in self.connections:
+            try:
+                conn.send(('stop',))
+            except OSError:
+                pass
+            conn.close()
+        for process in self.processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+
+
+def parallel_bfs(start: tuple[int, ...], goal: tuple[int, ...], nodes: NodeSet, fixed_areas: dict,
+                 workers: int | None = None, stats: dict | None = None,
+                 budget: Budget | None = None, max_path_length: int | None = 25) -> Sequence[tuple] | None:
+    # vectorized.numpy_bfs with every layer split over worker processes by a hash of the packed
+    # state, so each worker expands and deduplicates its own slice and only buffers travel.
+    if start == goal:
+        return []
+
+    workers = workers or os.cpu_count() or 1
+    search = ParallelSearch(goal, nodes, workers)
+    try:
+        search.seed('start', pack(start))
+        search.seed('goal', pack(goal))
+        limits = search_limits(max_path_length)
+        depths = dict(start=0, goal=0)
+        sizes = dict(start=1, goal=1)
+        visited = dict(start=1, goal=1)
+        peak_frontier = 2
+        expanded = 0
+
+        def update_stats():
+            if stats is not None:
+                stats.update(peak_frontier=peak_frontier, expanded=expanded, visited=sum(visited.values()),
+                             workers=workers)
+
+        while all(sizes.values()):
+            progressed = False
+            for side, other in (('start', 'goal'), ('goal', 'start')):
+                if depths[side] >= limits[side]:
+                    continue
+                if budget is not None:
+                    try:
+                        budget.check(sum(visited.values()) + sizes[side] * len(nodes.moves.forward),
+                                     state_size=STATE_BYTES)
+                        budget.poll()
+                    except BudgetExceeded:
+                        update_stats()
+                        raise
+                expanded += sizes[side]
+                sizes[side], visited[side], meeting = search.step(side, other)
+                depths[side] += 1
+                peak_frontier = max(peak_frontier, sizes['start'] + sizes['goal'])
+                progressed = True
+                if meeting is not None:
+                    other_depth, state = meeting
+                    meeting_depths = {side: depths[side], other: other_depth}
+                    path_start = search.trace(state, meeting_depths['start'], 'start', nodes)
+                    path_goal = search.trace(state, meeting_depths['goal'], 'goal', nodes)
+                    update_stats()
+                    return path_start[::-1] + path_goal
+            if not progressed:
+                break
+        update_stats()
+        if stats is not None:
+            # an empty layer means that side has seen every state it can reach
+            stats['exhausted'] = not all(sizes.values())
+        return None  # unsolvable or deeper than max_path_length
+    finally:
+        search.close()
@@ -0,0 +1,222 @@
+import hashlib
+import itertools
+import math
+import os
+import struct
+from collections import deque
+from collections.abc import Callable, Sequence
+from pathlib import Path
+
+from django.conf import settings
+
+from .board import NodeSet
+from .tables import UNREACHABLE
+
+MAGIC = b'RTPD'
+VERSION = 2
+HEADER = struct.Struct('<4sIQ')
+EXTENSION = '.pdb'
+FREE = 0
+# largest table built while solving, bigger ones come from build_pattern_databases
+BUILD_ON_DEMAND_LIMIT = 100_000
+PAIR_LIMIT = 4_000_000
+
+
+class MaskMover:
+    """A permutation applied to a bitmask of cells one byte at a time through lookup tables."""
+
+    def __init__(self, permutation: Sequence[int]):
+        cells = len(permutation)
+        targets = [0] * cells
+        for target, source in enumerate(permutation):
+            targets[source] = target
+        self.tables = []
+        for offset in range(0, cells, 8):
+            table = []
+            for byte in range(256):
+                moved = 0
+                for bit in range(8):
+                    if byte >> bit & 1 and offset + bit < cells:
+                        moved |= 1 << targets[offset + bit]
+                table.append(moved)
+            self.tables.append(table)
+
+    def __call__(self, mask: int) -> int:
+        moved = 0
+        for table in self.tables:
+            moved |= table[mask & 255]
+            mask >>= 8
+        return moved
+
+
+class PatternDatabase:
+    """
+    Exact distances of an abstraction of the board that only keeps the cells of one or two groups.
+    A slot is either the label of a fixed area, which has to end up in its own area, or FREE,
+    which has to end up in any area without a fixed colour.
+    """
+
+    def __init__(self, goal: Sequence[int], pattern: tuple[int, ...], table: bytes | bytearray | None = None):
+        cells = len(goal)
+        areas = {}
+        for index, label in enumerate(goal):
+            areas[label] = areas.get(label, 0) | (1 << index)
+        self.pattern = pattern
+        self.targets = [[areas[slot]] if slot != FREE else [mask for label, mask in areas.items() if label > 0]
+                        for slot in pattern]
+        self.sizes = [targets[0].bit_count() for targets in self.targets]
+        self.counts = [math.comb(cells, size) for size in self.sizes]
+        self.size = math.prod(self.counts)
+        # binomials[cell][k] is comb(cell, k), the colex rank of a mask sums one per set bit
+        self.binomials = [[math.comb(cell, k) for k in range(max(self.sizes, default=0) + 1)] for cell in range(cells)]
+        self.table = table
+
+    def rank(self, mask: int) -> int:
+        # colex rank among the masks with as many cells
+        rank = 0
+        k = 1
+        while mask:
+            low = mask & -mask
+            rank += self.binomials[low.bit_length() - 1][k]
+            mask ^= low
+            k += 1
+        return rank
+
+    def index(self, masks: Sequence[int]) -> int:
+        index = 0
+        for count, mask in zip(self.counts, masks):
+            index = index * count + self.rank(mask)
+        return index
+
+    def build(self, nodes: NodeSet):
+        movers = [MaskMover(permutation) for permutation, _ in nodes.moves.backward_permutations]
+        table = bytearray([UNREACHABLE]) * self.size
+        queue = deque()
+        for masks in itertools.product(*self.targets):
+            if sum(masks) == _union(masks):  # areas of different slots are distinct
+                index = self.index(masks)
+                if table[index] == UNREACHABLE:
+                    table[index] = 0
+                    queue.append(masks)
+        while queue:
+            masks = queue.popleft()
+            distance = table[self.index(masks)] + 1
+            for mover in movers:
+                prev = tuple(mover(mask) for mask in masks)
+                index = self.index(prev)
+                if table[index] == UNREACHABLE:
+                    table[index] = distance
+                    queue.append(prev)
+        self.table = table
+
+    def lookup(self, fixed: dict[int, int], free: Sequence[int]) -> int | None:
+        # The unfixed groups are interchangeable and so are FREE slots, so every combination is tried.
+        free_slots = self.pattern.count(FREE)
+        best = 0
+        for chosen in itertools.combinations(free, free_slots):
+            chosen = iter(chosen)
+            masks = [fixed[slot] if slot != FREE else next(chosen) for slot in self.pattern]
+            distance = self.table[self.index(masks)]
+            if distance == UNREACHABLE:
+                return None
+            best = max(best, distance)
+        return best
+
+    def write(self, path: Path):
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(self.table)))
+            f.write(self.table)
+        os.replace(tmp_path, path)
+
+    def read(self, path: Path) -> bool:
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, size = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION or size != self.size:
+            return False
+        self.table = memoryview(data)[HEADER.size:]
+        return True
+
+
+def _union(masks: Sequence[int]) -> int:
+    union = 0
+    for mask in masks:
+        union |= mask
+    return union
+
+
+def default_patterns(goal: Sequence[int]) -> list[tuple[int, ...]]:
+    # Pairs of groups when a pair table stays small, single groups otherwise.
+    labels = set(goal)
+    slots = sorted(label for label in labels if label < 0)
+    if len({goal.count(label) for label in labels if label > 0}) == 1:
+        slots += [FREE] * sum(1 for label in labels if label > 0)
+    size = max(goal.count(label) for label in labels)
+    width = 2 if math.comb(len(goal), size) ** 2 <= PAIR_LIMIT else 1
+    patterns = []
+    for i in range(0, len(slots), width):
+        pattern = tuple(slots[i: i + width])
+        if pattern not in patterns:
+            patterns.append(pattern)
+    return patterns
+
+
+def database_key(goal: Sequence[int], nodes: NodeSet, pattern: tuple[int, ...]) -> str:
+    moves = tuple((node.name(), node.index, node.allow_direct, node.allow_reverse) for node in nodes)
+    return hashlib.sha1(repr((tuple(goal), moves, pattern)).encode()).hexdigest()
+
+
+def database_path(key: str) -> Path | None:
+    directory = getattr(settings, 'DISTANCE_TABLES_DIR', None)
+    if directory is None:
+        return None
+    return Path(directory) / f'{key}{EXTENSION}'
+
+
+# None for databases too large to build while solving
+_databases: dict[str, PatternDatabase | None] = {}
+
+
+def get_database(goal: Sequence[int], nodes: NodeSet, pattern: tuple[int, ...],
+                 build: bool = False) -> PatternDatabase | None:
+    key = database_key(goal, nodes, pattern)
+    database = _databases.get(key)
+    if database is not None or (key in _databases and not build):
+        return database
+    database = PatternDatabase(goal, pattern)
+    path = database_path(key)
+    if path is None or not path.exists() or not database.read(path):
+        if not build and database.size > BUILD_ON_DEMAND_LIMIT:
+            _databases[key] = None
+            return None
+        database.build(nodes)
+        if path is not None and path.parent.is_dir():
+            database.write(path)
+    _databases[key] = database
+    return database
+
+
+class PatternHeuristic:
+    """Maximum of the pattern databases of a goal and a fallback heuristic, all of them admissible."""
+
+    def __init__(self, goal: Sequence[int], nodes: NodeSet, fallback: Callable[[tuple[int, ...]], int | None],
+                 patterns: Sequence[tuple[int, ...]] | None = None):
+        self.fallback = fallback
+        self.databases = [database for pattern in (patterns or default_patterns(goal))
+                          if (database := get_database(goal, nodes, pattern)) is not None]
+
+    def __call__(self, state: tuple[int, ...]) -> int | None:
+        estimate = self.fallback(state)
+        if estimate is None or not self.databases:
+            return estimate
+        masks = {}
+        for index, label in enumerate(state):
+            masks[label] = masks.get(label, 0) | (1 << index)
+        free = [mask for label, mask in masks.items() if label > 0]
+        for database in self.databases:
+            distance = database.lookup(masks, free)
+            if distance is None:
+                return None
+            estimate = max(estimate, distance)
+        return estimate
@@ -0,0 +1,49 @@
+from collections.abc import Iterable, Sequence
+
+from .board import NodeSet, get_nodes
+from .utils import encode
+
+
+class InvalidMove(Exception):
+    pass
+
+
+class Replay:
+    """
+    The allowed moves of a node set, each compiled to one itemgetter and keyed by (node index, symbol).
+    Colours are relabelled once at the end: `utils.encode` of a permuted state does not depend on
+    the labels the state had before.
+    """
+
+    def __init__(self, nodes: NodeSet):
+        self.moves = {mv: getter for getter, mv in nodes.moves.forward}
+
+    def play(self, state: tuple[int, ...], moves: Sequence[tuple[int, str]]) -> tuple[int, ...]:
+        for mv in moves:
+            getter = self.moves.get(tuple(mv))
+            if getter is None:
+                raise InvalidMove(mv)
+            state = getter(state)
+        return state
+
+    def is_solved(self, start: tuple[int, ...], goal: tuple[int, ...], moves: Sequence[tuple[int, str]],
+                  fixed_areas: dict | None = None) -> bool:
+        # `goal` is encoded, `start` is encoded or a board with the colours of `fixed_areas`
+        try:
+            state = self.play(start, moves)
+        except InvalidMove:
+            return False
+        return encode(state, fixed_areas or {}) == goal
+
+    def verify(self, start: tuple[int, ...], goal: tuple[int, ...], solutions: Iterable[Sequence[tuple[int, str]]],
+               fixed_areas: dict | None = None) -> list[bool]:
+        return [self.is_solved(start, goal, moves, fixed_areas) for moves in solutions]
+
+
+def verify_solutions(game, solutions: Iterable[Sequence[tuple[int, str]]]) -> list[bool]:
+    # Checks many submitted move lists of one daily or custom puzzle at once.
+    fixed_areas = game.fixed_areas_as_int
+    nodes = get_nodes(game.outline.rows, game.outline.cols, game.disabled_nodes_as_dict)
+    return Replay(nodes).verify(encode(game.board, fixed_areas),
+                                encode(game.outline.board, fixed_areas, for_outline=True),
+                                solutions)
@@ -0,0 +1,59 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+
+from .canonical import Canonical
+from .models import Solution
+
+MISSING = object()
+
+
+class SolutionCache:
+    """
+    Optimal solutions of canonical puzzles: a per-process LRU in front of the Solution table.
+    Unsolvable puzzles are cached as None.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.entries: OrderedDict[str, list[tuple] | None] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, canonical: Canonical) -> list[tuple] | None | object:
+        key = canonical.fingerprint
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+        stored = list(Solution.objects.filter(fingerprint=key).values_list('moves', flat=True))
+        if not stored:
+            return MISSING
+        moves = None if stored[0] is None else [tuple(mv) for mv in stored[0]]
+        self._remember(key, moves)
+        return moves
+
+    def get_many(self, canonicals: Sequence[Canonical]) -> list[list[tuple] | None | object]:
+        # `get` of every puzzle, with one query for those that are not in memory
+        with self.lock:
+            found = {c.fingerprint: self.entries[c.fingerprint] for c in canonicals if c.fingerprint in self.entries}
+        missing = {c.fingerprint for c in canonicals} - found.keys()
+        for key, stored in Solution.objects.filter(fingerprint__in=missing).values_list('fingerprint', 'moves'):
+            found[key] = None if stored is None else [tuple(mv) for mv in stored]
+            self._remember(key, found[key])
+        return [found.get(c.fingerprint, MISSING) for c in canonicals]
+
+    def set(self, canonical: Canonical, moves: Sequence[tuple] | None):
+        key = canonical.fingerprint
+        moves = None if moves is None else [tuple(mv) for mv in moves]
+        Solution.objects.get_or_create(fingerprint=key, defaults={'moves': moves})
+        self._remember(key, moves)
+
+    def _remember(self, key: str, moves: list[tuple] | None):
+        with self.lock:
+            self.entries[key] = moves
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+
+solutions = SolutionCache()
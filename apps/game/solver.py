@@ -1,91 +1,383 @@
-import math
 from collections import deque
-from collections.abc import Sequence, Iterable
+from collections.abc import Callable, Sequence, Iterable
 from typing import Any
 
-from .board import Node
-from .utils import encode
+from .board import NodeSet
+from .budget import Budget, BudgetExceeded
+from .canonical import Canonical, canonicalize
+from .patterns import PatternHeuristic
+from .replay import Replay
+from .packing import MAX_PACKED_LABEL, pack
+from .parallel import parallel_bfs
+from .solutions import MISSING, solutions
+from .tables import UNREACHABLE, DistanceTable, StaleTable, StateIndex, get_table
+from .utils import encode, relabel, search_limits
+from .vectorized import numpy_available, numpy_bfs, numpy_distance_table
 
+# visited states of a breadth-first search before solve_auto switches to the informed search
+BFS_STATE_LIMIT = 2_000_000
 
-def move(state: tuple[int, ...], node: Node, fixed_areas: dict | None = None, direct: bool = True) -> tuple:
-    s = node.move(state, direct=direct)
-    return s if fixed_areas is None else encode(s, fixed_areas)
 
+def neighbors(state: tuple[int, ...], nodes: NodeSet, reverse: bool = False) -> Iterable[tuple]:
+    # `state` is encoded, fixed areas included, so successors only need their groups renumbered
+    for getter, mv in (nodes.moves.backward if reverse else nodes.moves.forward):
+        yield relabel(getter(state)), mv
 
-def neighbors(state: tuple[int, ...], nodes: Sequence[Node], fixed_areas: dict, reverse: bool = False) -> Iterable[
-    tuple]:
-    for node in nodes:
-        if reverse:
-            if node.allow_reverse:
-                yield move(state, node, fixed_areas, True), (node.index, node.reverse_symbol)
-            if node.allow_direct:
-                yield move(state, node, fixed_areas, False), (node.index, node.symbol)
-        else:
-            if node.allow_direct:
-                yield move(state, node, fixed_areas, True), (node.index, node.symbol)
-            if node.allow_reverse:
-                yield move(state, node, fixed_areas, False), (node.index, node.reverse_symbol)
+
+def trace(visited: dict, state: Any) -> list[tuple]:
+    # Moves along the predecessor chain of `state`, starting with the move that leaves it.
+    path = []
+    while (parent := visited[state]) is not None:
+        state, mv = parent
+        path.append(mv)
+    return path
 
 
-def bfs(start: tuple[int, ...], goal: tuple[int, ...], nodes: Sequence[Node], fixed_areas: dict) -> Sequence[
-                                                                                                        tuple] | None:
-    max_path_length = 25
+def bfs(start: tuple[int, ...], goal: tuple[int, ...], nodes: NodeSet, fixed_areas: dict,
+        packed: bool = False, stats: dict | None = None, budget: Budget | None = None,
+        max_path_length: int | None = 25) -> Sequence[tuple] | None:
+    # Without max_path_length the search ends only when a side runs out of states, so None
+    # means unsolvable.
+    limits = search_limits(max_path_length)
 
+    start = encode(start, fixed_areas)
     if start == goal:
         return []
 
+    if packed:
+        # states are single ints, see packing.py
+        start, goal = pack(start), pack(goal)
+        expand = nodes.packed_moves.neighbors
+    else:
+        def expand(state, reverse):
+            return neighbors(state, nodes, reverse=reverse)
+
     # BFS from start
     q_start = deque([start])
-    visited_start = {start: []}
+    visited_start = {start: None}
+    depth_start = 0
     # BFS from goal
     q_goal = deque([goal])
-    visited_goal = {goal: []}
+    visited_goal = {goal: None}
+    depth_goal = 0
+    # each visited state keeps only its predecessor and the move between them
+    peak_frontier = 2
+    expanded = 0
+    # sides that dropped states at their depth limit
+    capped = dict(start=False, goal=False)
+
+    def update_stats():
+        if stats is not None:
+            stats.update(peak_frontier=peak_frontier, visited=len(visited_start) + len(visited_goal),
+                         expanded=expanded)
+
+    def finish(state):
+        update_stats()
+        return trace(visited_start, state)[::-1] + trace(visited_goal, state)
+
+    def spend(state):
+        nonlocal expanded
+        expanded += 1
+        if budget is not None:
+            try:
+                budget.check(len(visited_start) + len(visited_goal), state)
+            except BudgetExceeded:
+                update_stats()
+                raise
+
     while q_start and q_goal:
         # Expand from start
         for _ in range(len(q_start)):
             cur = q_start.popleft()
-            path = visited_start[cur]
-            if len(path) >= (max_path_length // 2 + (max_path_length % 2)):
+            if depth_start >= limits['start']:
+                capped['start'] = True
                 continue
-            for nxt, mv in neighbors(cur, nodes, fixed_areas, reverse=False):
+            spend(cur)
+            for nxt, mv in expand(cur, reverse=False):
                 if nxt not in visited_start:
-                    visited_start[nxt] = path + [mv]
+                    visited_start[nxt] = (cur, mv)
                     if nxt in visited_goal:
                         # Meeting point found
-                        return visited_start[nxt] + list(reversed(visited_goal[nxt]))
+                        return finish(nxt)
                     q_start.append(nxt)
+        depth_start += 1
+        peak_frontier = max(peak_frontier, len(q_start) + len(q_goal))
         # Expand from goal
         for _ in range(len(q_goal)):
             cur = q_goal.popleft()
-            path = visited_goal[cur]
-            if len(path) >= (max_path_length // 2):
+            if depth_goal >= limits['goal']:
+                capped['goal'] = True
                 continue
-            for nxt, mv in neighbors(cur, nodes, fixed_areas, reverse=True):
+            spend(cur)
+            for nxt, mv in expand(cur, reverse=True):
                 if nxt not in visited_goal:
-                    visited_goal[nxt] = path + [mv]
+                    visited_goal[nxt] = (cur, mv)
                     if nxt in visited_start:
                         # Meeting point found
-                        return visited_start[nxt] + list(reversed(visited_goal[nxt]))
+                        return finish(nxt)
                     q_goal.append(nxt)
-    return None  # unsolvable
-
-
-def is_solved(start: Sequence[Any], goal: Sequence[Any], moves: Sequence[tuple[int, bool]],
-              fixed_areas: dict, disabled_nodes: dict) -> bool:
-    return False
-    n = int(math.sqrt(len(start)))
-    blocks = {block.index: block for block in Block.get_blocks(n, n, disabled_nodes)}
-    for index, cw in moves:
-        if index not in blocks:
-            return False
-        block = blocks[index]
-        if getattr(block, f'allow_{'cw' if cw else 'ccw'}'):
-            start = rotate_block(start, block.indices, fixed_areas, cw)
+        depth_goal += 1
+        peak_frontier = max(peak_frontier, len(q_start) + len(q_goal))
+    update_stats()
+    if stats is not None:
+        # a side that ran out of states below its limit has seen every state it can reach
+        stats['exhausted'] = (not q_start and not capped['start']) or (not q_goal and not capped['goal'])
+    return None  # unsolvable or deeper than max_path_length
+
+
+def build_distance_table(goal: tuple[int, ...], nodes: NodeSet, fixed_areas: dict) -> bytearray:
+    # Breadth-first search backwards from the goal, one layer per pass over the table.
+    if numpy_available(goal):
+        return numpy_distance_table(goal, nodes)
+    index = StateIndex(goal)
+    table = bytearray([UNREACHABLE]) * index.size
+    table[index.rank(goal)] = 0
+    depth = 0
+    found = True
+    while found and depth < UNREACHABLE - 1:
+        found = False
+        marker = bytes([depth])
+        position = table.find(marker)
+        while position != -1:
+            for prev, _ in neighbors(index.unrank(position), nodes, reverse=True):
+                rank = index.rank(prev)
+                if table[rank] == UNREACHABLE:
+                    table[rank] = depth + 1
+                    found = True
+            position = table.find(marker, position + 1)
+        depth += 1
+    return table
+
+
+def walk(start: tuple[int, ...], table: DistanceTable, nodes: NodeSet, fixed_areas: dict) -> Sequence[
+                                                                                                      tuple] | None:
+    state = encode(start, fixed_areas)
+    distance = table.distance(state)
+    if distance is None:
+        return None  # unsolvable
+    path = []
+    while distance:
+        for nxt, mv in neighbors(state, nodes):
+            if table.distance(nxt) == distance - 1:
+                break
         else:
-            return False
-    return start == encode(goal, fixed_areas, for_outline=True)
+            raise StaleTable(f'No move of {state} gets closer than {distance} moves to the goal.')
+        state = nxt
+        path.append(mv)
+        distance -= 1
+    return path
+
+
+class CellDistanceHeuristic:
+    """
+    Admissible estimate of the number of moves left: every cell has to reach an area of the goal
+    with its label (any unfixed area for unfixed groups), a cell travels one step per move and a move
+    carries at most `moved` cells, so neither the farthest cell nor the total distance divided by
+    `moved` can overestimate.
+    """
+
+    def __init__(self, goal: tuple[int, ...], nodes: NodeSet):
+        cells = len(goal)
+        predecessors = [set() for _ in range(cells)]
+        self.moved = 1
+        for permutation, _ in nodes.moves.forward_permutations:
+            moved = 0
+            for target, source in enumerate(permutation):
+                if target != source:
+                    predecessors[target].add(source)
+                    moved += 1
+            self.moved = max(self.moved, moved)
+
+        areas = {}
+        for index, label in enumerate(goal):
+            areas.setdefault(label, []).append(index)
+        # distance from every cell to every area of the goal, None when it cannot get there
+        self.distances = {}
+        for label, area in areas.items():
+            distances = [None] * cells
+            for index in area:
+                distances[index] = 0
+            queue = deque(area)
+            while queue:
+                index = queue.popleft()
+                for source in predecessors[index]:
+                    if distances[source] is None:
+                        distances[source] = distances[index] + 1
+                        queue.append(source)
+            self.distances[label] = distances
+        self.free = [self.distances[label] for label in areas if label > 0]
+
+    def __call__(self, state: tuple[int, ...]) -> int | None:
+        groups = {}
+        for index, label in enumerate(state):
+            groups.setdefault(label, []).append(index)
+        total = farthest = 0
+        for label, indices in groups.items():
+            sums, maxes = [], []
+            for distances in ([self.distances[label]] if label < 0 else self.free):
+                steps = [distances[index] for index in indices]
+                if None not in steps:
+                    sums.append(sum(steps))
+                    maxes.append(max(steps))
+            if not sums:
+                return None  # unsolvable
+            total += min(sums)
+            farthest = max(farthest, min(maxes))
+        return max(-(-total // self.moved), farthest)
+
+
+def ida_star(start: tuple[int, ...], goal: tuple[int, ...], nodes: NodeSet, fixed_areas: dict,
+             heuristic: Callable[[tuple[int, ...]], int | None] | None = None,
+             max_path_length: int = 50, stats: dict | None = None,
+             budget: Budget | None = None) -> Sequence[tuple] | None:
+    # Iterative deepening A*: depth-first searches bounded by path length plus the heuristic,
+    # so memory stays linear in the depth of the solution.
+    start = encode(start, fixed_areas)
+    heuristic = heuristic or PatternHeuristic(goal, nodes, CellDistanceHeuristic(goal, nodes))
+    moves = nodes.moves.forward
+    redundant = nodes.moves.redundant
+    path = []
+    expanded = 0
+
+    def search(state, depth, bound, previous):
+        nonlocal expanded
+        estimate = heuristic(state)
+        if estimate is None:
+            return None
+        if depth + estimate > bound:
+            return depth + estimate
+        # states below are not renumbered, the heuristic does not look at group numbers and
+        # is 0 at the goal, so only then the state is compared with it
+        if not estimate and relabel(state) == goal:
+            return True
+        expanded += 1
+        if budget is not None:
+            budget.check(expanded)
+        smallest = None
+        skip = redundant[previous] if previous is not None else None
+        for i, (getter, mv) in enumerate(moves):
+            if skip is not None and skip[i]:
+                continue
+            path.append(mv)
+            result = search(getter(state), depth + 1, bound, i)
+            if result is True:
+                return True
+            path.pop()
+            if result is not None and (smallest is None or result < smallest):
+                smallest = result
+        return smallest
+
+    bound = heuristic(start)
+    try:
+        while bound is not None and bound <= max_path_length:
+            result = search(start, 0, bound, None)
+            if result is True:
+                break
+            bound = result
+    finally:
+        if stats is not None:
+            # exhausted: no bound is left, the heuristic ruled every path out
+            stats.update(expanded=expanded, depth=len(path), exhausted=bound is None)
+    return path if bound is not None and bound <= max_path_length else None
+
+
+def is_solved(start: tuple[int, ...], goal: tuple[int, ...], moves: Sequence[tuple[int, str]], nodes: NodeSet) -> bool:
+    # start and goal encoded, see replay.Replay
+    return Replay(nodes).is_solved(start, goal, moves)
+
+
+class SolveResult:
+    """Outcome of `solve`: the moves when solved, and search statistics in every case."""
+
+    SOLVED = 'solved'
+    UNSOLVABLE = 'unsolvable'
+    EXCEEDED = 'budget-exceeded'
+
+    def __init__(self, status: str, moves: Sequence[tuple] | None = None, stats: dict | None = None):
+        self.status = status
+        self.moves = moves
+        self.stats = stats or {}
+
+    @property
+    def solved(self) -> bool:
+        return self.status == self.SOLVED
+
+    def __repr__(self):
+        return f'SolveResult({self.status!r}, {self.moves!r}, {self.stats!r})'
+
+
+def solve_canonical(canonical: Canonical, method: str = 'auto', budget: Budget | None = None,
+                    stats: dict | None = None) -> Sequence[tuple] | None:
+    # Encoded states need no fixed areas to re-encode: their colours are already negative.
+    board, outline, nodes = canonical.start, canonical.goal, canonical.nodes
+    table = get_table(outline, nodes)
+    if table is not None:
+        return walk(board, table, nodes, {})
+    if method == 'auto':
+        return solve_auto(canonical, budget or Budget(), stats)
+    stats = {} if stats is None else stats
+    if method == 'ida':
+        solution = ida_star(board, outline, nodes, {}, stats=stats, budget=budget)
+    elif method == 'numpy' and numpy_available(outline):
+        solution = numpy_bfs(board, outline, nodes, {}, stats=stats, budget=budget)
+    elif method == 'parallel' and numpy_available(outline):
+        solution = parallel_bfs(board, outline, nodes, {}, stats=stats, budget=budget)
+    else:
+        solution = bfs(board, outline, nodes, {}, packed=max(map(abs, outline)) <= MAX_PACKED_LABEL, stats=stats,
+                       budget=budget)
+    if solution is None and not stats.get('exhausted'):
+        # stopped at the depth limit of the method, which proves nothing about the puzzle
+        raise BudgetExceeded('depth')
+    return solution
+
+
+def full_bfs(canonical: Canonical, method: str, budget: Budget, stats: dict | None) -> Sequence[tuple] | None:
+    board, outline, nodes = canonical.start, canonical.goal, canonical.nodes
+    if method == 'numpy':
+        return numpy_bfs(board, outline, nodes, {}, stats=stats, budget=budget, max_path_length=None)
+    return bfs(board, outline, nodes, {}, packed=max(map(abs, outline)) <= MAX_PACKED_LABEL, stats=stats,
+               budget=budget, max_path_length=None)
+
+
+def solve_auto(canonical: Canonical, budget: Budget, stats: dict | None = None) -> Sequence[tuple] | None:
+    # Breadth-first search is the fastest while its visited states stay few, which is always the
+    # case for small state spaces. Past BFS_STATE_LIMIT states the informed search takes over,
+    # its memory only grows with the depth of the solution.
+    outline = canonical.goal
+    method = 'numpy' if numpy_available(outline) else 'bfs'
+    if stats is not None:
+        stats['method'] = method
+    # No depth limit: the search stops when the reachable states run out, so its None can be
+    # cached as unsolvable.
+    if StateIndex(outline).size <= BFS_STATE_LIMIT:
+        return full_bfs(canonical, method, budget, stats)
+    try:
+        return full_bfs(canonical, method, budget.limited(BFS_STATE_LIMIT), stats)
+    except BudgetExceeded as e:
+        if e.reason != 'states' or (budget.max_states is not None and budget.max_states <= BFS_STATE_LIMIT):
+            raise
+    if stats is not None:
+        stats.clear()
+        stats['method'] = 'ida'
+    return solve_canonical(canonical, 'ida', budget, stats)
 
 
-def solve(board: tuple[int, ...], outline: tuple[int, ...], nodes: Sequence[Node], fixed_areas: dict) -> Sequence[
-                                                                                                             tuple] | None:
-    return bfs(board, outline, nodes, fixed_areas)
+def solve(board: tuple[int, ...], outline: tuple[int, ...], nodes: NodeSet, fixed_areas: dict,
+          method: str = 'auto', budget: Budget | None = None) -> SolveResult:
+    budget = budget or Budget()
+    stats = {}
+    canonical = canonicalize(board, outline, nodes)
+    solution = solutions.get(canonical)
+    if solution is MISSING:
+        try:
+            solution = solve_canonical(canonical, method, budget, stats)
+        except BudgetExceeded as e:
+            stats.update(reason=e.reason, elapsed=budget.elapsed)
+            return SolveResult(SolveResult.EXCEEDED, stats=stats)
+        solutions.set(canonical, solution)
+    else:
+        stats['cached'] = True
+    stats['elapsed'] = budget.elapsed
+    if solution is None:
+        return SolveResult(SolveResult.UNSOLVABLE, stats=stats)
+    return SolveResult(SolveResult.SOLVED, canonical.to_original(solution), stats)
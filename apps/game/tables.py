@@ -0,0 +1,269 @@
+import hashlib
+import mmap
+import os
+import struct
+import time
+from collections.abc import Sequence
+from functools import lru_cache
+from math import factorial
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import numpy as np
+except ImportError:  # optional, only rank_many needs it
+    np = None
+
+from .board import Node
+
+UNREACHABLE = 0xFF
+MAGIC = b'RTDT'
+VERSION = 1
+HEADER = struct.Struct('<4sIQ')
+EXTENSION = '.dist'
+# seconds a missing table is remembered, build_distance_tables may add it from another process
+MISS_TTL = 60
+# misses remembered at most, past it they are all forgotten
+MAX_MISSING = 4096
+
+
+class StaleTable(RuntimeError):
+    pass
+
+
+@lru_cache(maxsize=None)
+def _completions(counts: tuple[int, ...], unopened: tuple[int, ...]) -> int:
+    # Number of ways to fill the remaining cells: opened groups and fixed areas are
+    # distinct symbols, groups that have not appeared yet are interchangeable.
+    result = factorial(sum(counts) + sum(unopened))
+    for count in counts + unopened:
+        result //= factorial(count)
+    for size in set(unopened):
+        result //= factorial(unopened.count(size))
+    return result
+
+
+@lru_cache(maxsize=None)
+def _without(unopened: tuple[int, ...], size: int) -> tuple[int, ...]:
+    lst = list(unopened)
+    lst.remove(size)
+    return tuple(lst)
+
+
+@lru_cache(maxsize=None)
+def _skipped(counts: tuple[int, ...], unopened: tuple[int, ...], slot: int, size: int) -> int:
+    # Sum of completions of every symbol ordered before `slot`: fixed areas and opened
+    # groups first, then not yet opened groups by size.
+    result = 0
+    lst = list(counts)
+    for i in range(min(slot, len(counts))):
+        if lst[i]:
+            lst[i] -= 1
+            result += _completions(tuple(lst), unopened)
+            lst[i] += 1
+    if slot == len(counts):
+        for smaller in sorted(set(unopened)):
+            if smaller >= size:
+                break
+            result += _completions(counts + (smaller - 1,), _without(unopened, smaller))
+    return result
+
+
+class StateIndex:
+    """
+    Dense ranking of the encoded states that share the label structure of a goal.
+    Fixed areas (negative labels) are ranked as distinct symbols, the other groups only
+    by the cells they occupy, so every reachable state gets a unique index below `size`.
+    """
+
+    def __init__(self, goal: Sequence[int]):
+        labels = sorted(set(goal))
+        self.cells = len(goal)
+        self.fixed_labels = tuple(label for label in labels if label < 0)
+        self.fixed_sizes = tuple(goal.count(label) for label in self.fixed_labels)
+        self.free_sizes = tuple(sorted(goal.count(label) for label in labels if label > 0))
+        self.size = _completions(self.fixed_sizes, self.free_sizes)
+
+    def rank(self, state: Sequence[int]) -> int:
+        counts = list(self.fixed_sizes)
+        slots = {label: i for i, label in enumerate(self.fixed_labels)}
+        unopened = self.free_sizes
+        rank = 0
+        for value in state:
+            slot = slots.get(value)
+            if slot is None:
+                size = state.count(value)
+                rank += _skipped(tuple(counts), unopened, len(counts), size)
+                slots[value] = len(counts)
+                counts.append(size - 1)
+                unopened = _without(unopened, size)
+            else:
+                rank += _skipped(tuple(counts), unopened, slot, 0)
+                counts[slot] -= 1
+        return rank
+
+    def rank_many(self, states: 'np.ndarray') -> 'np.ndarray':
+        # `rank` of every row of a (states, cells) array. The counts left before a cell take few
+        # distinct values, so `_skipped` runs once per distinct value and the rows only gather.
+        rows, cells = states.shape
+        fixed = len(self.fixed_labels)
+        slots = fixed + len(self.free_sizes)
+        slot = np.zeros(states.shape, dtype=np.int64)
+        for i, label in enumerate(self.fixed_labels):
+            slot[states == label] = i
+        # groups get their slots in order of appearance, which is the order of their labels
+        row_numbers, cell_numbers = np.nonzero(states > 0)
+        labels = states[row_numbers, cell_numbers].astype(np.intp)
+        present = np.zeros((rows, cells + 1), dtype=np.int64)
+        present[row_numbers, labels] = 1
+        slot[row_numbers, cell_numbers] = fixed + np.cumsum(present, axis=1)[row_numbers, labels] - 1
+        left = np.stack([(slot == i).sum(axis=1) for i in range(slots)], axis=1)
+        opened = np.zeros(rows, dtype=np.int64)
+        # mixed radix code of the counts left, the number of opened groups and the slot
+        radices = [size + 1 for size in self.fixed_sizes] + [max(self.free_sizes, default=0) + 1] * len(self.free_sizes)
+        weights = np.cumprod([1] + radices[:-1], dtype=np.int64)
+        row_numbers = np.arange(rows)
+        rank = np.zeros(rows, dtype=np.int64)
+        for cell in range(cells):
+            current = slot[:, cell]
+            codes = ((left * weights).sum(axis=1) * (len(self.free_sizes) + 1) + opened) * slots + current
+            _, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+            skipped = []
+            for row in first.tolist():
+                known = fixed + int(opened[row])
+                counts = tuple(left[row, :known].tolist())
+                unopened = tuple(sorted(left[row, known:].tolist()))
+                if current[row] == known:
+                    skipped.append(_skipped(counts, unopened, known, int(left[row, known])))
+                else:
+                    skipped.append(_skipped(counts, unopened, int(current[row]), 0))
+            rank += np.array(skipped, dtype=np.int64)[inverse.reshape(-1)]
+            opened += current == fixed + opened
+            left[row_numbers, current] -= 1
+        return rank
+
+    def unrank(self, rank: int) -> tuple[int, ...]:
+        counts = list(self.fixed_sizes)
+        labels = list(self.fixed_labels)
+        unopened = self.free_sizes
+        seen = set()
+        next_id = 1
+        state = []
+        for _ in range(self.cells):
+            chosen = None
+            for i, count in enumerate(counts):
+                if count:
+                    counts[i] -= 1
+                    completions = _completions(tuple(counts), unopened)
+                    if rank < completions:
+                        chosen = i
+                        break
+                    counts[i] += 1
+                    rank -= completions
+            if chosen is None:
+                for size in sorted(set(unopened)):
+                    completions = _completions(tuple(counts) + (size - 1,), _without(unopened, size))
+                    if rank < completions:
+                        chosen = len(counts)
+                        counts.append(size - 1)
+                        labels.append(next_id)
+                        unopened = _without(unopened, size)
+                        break
+                    rank -= completions
+            if chosen not in seen:
+                # mirror utils.encode: every new value, fixed or not, consumes an id
+                seen.add(chosen)
+                next_id += 1
+            state.append(labels[chosen])
+        return tuple(state)
+
+
+class DistanceTable:
+    """Exact distance to the goal for every state of a `StateIndex`, one byte per state."""
+
+    def __init__(self, buffer: bytes | bytearray | mmap.mmap, index: StateIndex, offset: int = 0):
+        self.buffer = buffer
+        self.index = index
+        self.offset = offset
+
+    def distance(self, state: Sequence[int]) -> int | None:
+        value = self.buffer[self.offset + self.index.rank(state)]
+        return None if value == UNREACHABLE else value
+
+    @classmethod
+    def open(cls, buffer: mmap.mmap, index: StateIndex) -> 'DistanceTable | None':
+        magic, version, size = HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION or size != index.size:
+            return None
+        return cls(buffer, index, HEADER.size)
+
+    @staticmethod
+    def write(path: Path, table: bytearray):
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(table)))
+            f.write(table)
+        os.replace(tmp_path, path)
+
+
+def _moves(nodes: Sequence[Node]) -> tuple:
+    return tuple((node.name(), node.index, node.allow_direct, node.allow_reverse) for node in nodes)
+
+
+def table_key(goal: Sequence[int], nodes: Sequence[Node]) -> str:
+    return hashlib.sha1(repr((tuple(goal), _moves(nodes))).encode()).hexdigest()
+
+
+def table_path(goal: Sequence[int], nodes: Sequence[Node]) -> Path | None:
+    directory = getattr(settings, 'DISTANCE_TABLES_DIR', None)
+    if directory is None:
+        return None
+    return Path(directory) / f'{table_key(goal, nodes)}{EXTENSION}'
+
+
+_mapped: dict[str, mmap.mmap] = {}
+# (directory, goal, moves) of tables that were not on disk, with the time they were looked for
+_missing: dict[tuple, float] = {}
+
+
+def _map(path: Path) -> mmap.mmap:
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    _mapped[path.stem] = buffer
+    return buffer
+
+
+def load_tables():
+    directory = getattr(settings, 'DISTANCE_TABLES_DIR', None)
+    if directory is None or not os.path.isdir(directory):
+        return
+    for path in Path(directory).glob(f'*{EXTENSION}'):
+        if path.stem not in _mapped:
+            _map(path)
+
+
+@lru_cache(maxsize=64)
+def _state_index(goal: tuple[int, ...]) -> StateIndex:
+    return StateIndex(goal)
+
+
+def get_table(goal: Sequence[int], nodes: Sequence[Node]) -> DistanceTable | None:
+    # Most puzzles have no table, so a miss is remembered for MISS_TTL seconds instead of
+    # hashing the key and looking at the disk on every solve.
+    key = (getattr(settings, 'DISTANCE_TABLES_DIR', None), tuple(goal), _moves(nodes))
+    missed = _missing.get(key)
+    if missed is not None and time.monotonic() - missed < MISS_TTL:
+        return None
+    path = table_path(goal, nodes)
+    if path is None:
+        return None
+    buffer = _mapped.get(path.stem)
+    if buffer is None:
+        if not path.exists():
+            if len(_missing) >= MAX_MISSING:
+                _missing.clear()
+            _missing[key] = time.monotonic()
+            return None
+        buffer = _map(path)
+    return DistanceTable.open(buffer, _state_index(tuple(goal)))
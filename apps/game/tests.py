@@ -0,0 +1,253 @@
+import functools
+import random
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from . import jobs
+from .board import get_nodes
+from .budget import Budget
+from .caching import page_cache, page_key
+from .canonical import canonicalize, symmetries
+from .counting import OptimalSolutions, count_solutions
+from .models import Custom, Outline, Solution, SolveJob
+from .parallel import parallel_bfs
+from .solutions import solutions
+from .solver import SolveResult, build_distance_table, full_bfs, is_solved, solve, solve_canonical, walk
+from .tables import DistanceTable, StateIndex
+from .utils import encode
+from .vectorized import numpy_distance_table
+
+
+class TwoCellLineTests(TestCase):
+    # On a side of two cells a shift moves alike in both directions, each direction still
+    # has to keep its own allow flag through the symmetries of the board.
+
+    def setUp(self):
+        self.outline = encode((1, 1, 1, 2, 2, 2), {}, for_outline=True)
+        self.board = encode((2, 1, 1, 1, 2, 2), {})
+
+    def nodes(self, disallow_direct: bool, disallow_reverse: bool):
+        # 2x3: rotations 1-2, columns 3-5, rows 6-7, only the first column enabled
+        disabled = {key: (True, True) for key in range(1, 8)}
+        disabled[3] = (disallow_direct, disallow_reverse)
+        return get_nodes(2, 3, disabled)
+
+    def test_only_direct(self):
+        result = solve(self.board, self.outline, self.nodes(False, True), {})
+        self.assertEqual(result.moves, [(1, '↓')])
+        result = count_solutions(self.board, self.outline, self.nodes(False, True))
+        self.assertEqual(result.stats['count'], 1)
+
+    def test_only_reverse(self):
+        result = solve(self.board, self.outline, self.nodes(True, False), {})
+        self.assertEqual(result.moves, [(1, '↑')])
+
+    def test_both(self):
+        result = count_solutions(self.board, self.outline, self.nodes(False, False))
+        self.assertEqual((result.stats['length'], result.stats['count']), (1, 2))
+
+
+class DepthLimitTests(TestCase):
+    # A search that stops at its depth limit has not shown that the puzzle is unsolvable.
+
+    def setUp(self):
+        solutions.entries.clear()
+        self.outline = encode((1, 1, 1, 2, 2, 2), {}, for_outline=True)
+        self.board = encode((2, 1, 1, 1, 2, 2), {})
+        self.nodes = get_nodes(2, 3)
+
+    def test_capped_search_is_not_cached(self):
+        with mock.patch('apps.game.solver.bfs', return_value=None):
+            result = solve(self.board, self.outline, self.nodes, {}, method='bfs')
+        self.assertEqual((result.status, result.stats['reason']), (SolveResult.EXCEEDED, 'depth'))
+        self.assertFalse(Solution.objects.exists())
+        self.assertTrue(solve(self.board, self.outline, self.nodes, {}).solved)
+
+    def test_unsolvable_is_cached(self):
+        nodes = get_nodes(2, 3, {key: (True, True) for key in range(1, 8)})
+        result = solve(self.board, self.outline, nodes, {})
+        self.assertEqual(result.status, SolveResult.UNSOLVABLE)
+        self.assertEqual(list(Solution.objects.values_list('moves', flat=True)), [None])
+
+    def test_counting_past_its_depth(self):
+        board = encode((2, 1, 1, 2, 2, 1), {})
+        with mock.patch('apps.game.counting.get_table', return_value=None):
+            with mock.patch.object(OptimalSolutions, 'max_path_length', 1):
+                result = count_solutions(board, self.outline, self.nodes)
+            self.assertEqual((result.status, result.stats['reason']), (SolveResult.EXCEEDED, 'depth'))
+            self.assertTrue(count_solutions(board, self.outline, self.nodes).solved)
+
+
+class LargeBoardTests(TestCase):
+    # 6x6 boards come from the create page, their solves have to stay within the job budget.
+
+    def test_ida_respects_budget(self):
+        outline = encode(tuple(i // 9 + 1 for i in range(36)), {}, for_outline=True)
+        board = list(outline)
+        random.Random(1).shuffle(board)
+        board = encode(board, {})
+        budget = Budget(max_seconds=0.5)
+        result = solve(board, outline, get_nodes(6, 6), {}, method='ida', budget=budget)
+        self.assertEqual(result.status, SolveResult.EXCEEDED)
+        self.assertLess(budget.elapsed, 5)
+
+
+class SolverCrossCheckTests(TestCase):
+    # Every search method has to find solutions as short as the plain breadth-first search does,
+    # on random puzzles small enough for all of them.
+
+    methods = ('bfs', 'numpy', 'parallel', 'ida')
+
+    def puzzles(self, count: int):
+        rng = random.Random(7)
+        shapes = [(2, 3, 3), (2, 3, 2), (3, 3, 3), (3, 4, 3), (3, 4, 4)]
+        for i in range(count):
+            rows, cols, size = shapes[i % len(shapes)]
+            outline = [cell // size + 1 for cell in range(rows * cols)]
+            rng.shuffle(outline)
+            board = outline[:]
+            rng.shuffle(board)
+            nodes = get_nodes(rows, cols)
+            # moves disabled in one or both directions, every other puzzle keeps only a few of them
+            # and is often unsolvable
+            disabled = {key: rng.choice([(True, True), (True, False), (False, True)]) if i % 2 else (True, True)
+                        for key in range(1, len(nodes) + 1) if rng.random() < (0.5 if i % 2 else 0.8)}
+            yield canonicalize(encode(board, {}), encode(outline, {}, for_outline=True),
+                               get_nodes(rows, cols, disabled))
+
+    def assertSolves(self, canonical, moves, length):
+        self.assertEqual(len(moves), length)
+        self.assertTrue(is_solved(canonical.start, canonical.goal, moves, canonical.nodes))
+
+    def test_methods_agree_with_full_bfs(self):
+        with mock.patch('apps.game.solver.get_table', return_value=None), \
+                mock.patch('apps.game.solver.parallel_bfs', functools.partial(parallel_bfs, workers=2)):
+            for canonical in self.puzzles(15):
+                expected = full_bfs(canonical, 'bfs', Budget(), {})
+                for method in self.methods:
+                    with self.subTest(start=canonical.start, goal=canonical.goal, method=method):
+                        solution = solve_canonical(canonical, method, Budget(), {})
+                        if expected is None:
+                            self.assertIsNone(solution)
+                        else:
+                            self.assertSolves(canonical, solution, len(expected))
+
+    def test_tables_agree_with_full_bfs(self):
+        for canonical in self.puzzles(10):
+            expected = full_bfs(canonical, 'bfs', Budget(), {})
+            table = build_distance_table(canonical.goal, canonical.nodes, {})
+            self.assertEqual(numpy_distance_table(canonical.goal, canonical.nodes), table)
+            solution = walk(canonical.start, DistanceTable(table, StateIndex(canonical.goal)), canonical.nodes, {})
+            with self.subTest(start=canonical.start, goal=canonical.goal):
+                if expected is None:
+                    self.assertIsNone(solution)
+                else:
+                    self.assertSolves(canonical, solution, len(expected))
+
+
+class CanonicalTests(TestCase):
+    # Puzzles that differ by a symmetry of the board or renamed colours share one solution.
+
+    def test_symmetric_puzzles(self):
+        rng = random.Random(3)
+        outline = [cell // 3 + 1 for cell in range(12)]
+        rng.shuffle(outline)
+        board = outline[:]
+        rng.shuffle(board)
+        nodes = get_nodes(3, 4, {2: (True, False)})
+        first = canonicalize(encode(board, {}), encode(outline, {}, for_outline=True), nodes)
+        path = full_bfs(first, 'bfs', Budget(), {})
+        recolour = {1: 3, 2: 4, 3: 1, 4: 2}
+        for symmetry in symmetries(3, 4):
+            start = encode([recolour[colour] for colour in symmetry.transform(board)], {})
+            goal = encode([recolour[colour] for colour in symmetry.transform(outline)], {}, for_outline=True)
+            moved = get_nodes(symmetry.rows, symmetry.cols)
+            for position, node in enumerate(nodes):
+                for direct, allow in ((True, node.allow_direct), (False, node.allow_reverse)):
+                    target, target_direct = symmetry.moves[position, direct]
+                    setattr(moved[target], 'allow_direct' if target_direct else 'allow_reverse', allow)
+            with self.subTest(symmetry=symmetry):
+                canonical = canonicalize(start, goal, moved)
+                self.assertEqual(canonical, first)
+                self.assertTrue(is_solved(start, goal, canonical.to_original(path), moved))
+
+
+PAGE_SETTINGS = dict(
+    DEBUG=False,
+    STORAGES={'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+              'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}},
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'pages': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'pages'}},
+)
+
+
+@override_settings(**PAGE_SETTINGS)
+class GameViewTests(TestCase):
+    # Pages answer conditional requests without rendering and are cached until their puzzle changes.
+
+    def setUp(self):
+        page_cache().clear()
+        outline = Outline.objects.create(index=1, board=[1, 1, 1, 2, 2, 2], rows=2, cols=3)
+        self.custom = Custom.objects.create(index='abcdefg', board=[2, 1, 1, 1, 2, 2],
+                                            encoded_board=[1, 0, 0, 0, 1, 1], moves_min_num=1, outline=outline)
+        self.url = reverse('custom', args=(self.custom.index,))
+
+    def test_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        self.assertNotEqual(self.client.get(self.url + '?moves=1↻')['ETag'], etag)
+
+        self.custom.board = [2, 2, 1, 1, 1, 2]
+        self.custom.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_page_cache(self):
+        key = page_key('Custom', self.custom.index)
+        html = self.client.get(self.url).content.decode()
+        self.assertEqual(page_cache().get(key)[1], html)
+        with mock.patch('apps.game.views.TemplateView.get') as render:
+            self.assertEqual(self.client.get(self.url).content.decode(), html)
+        render.assert_not_called()
+        # pages with moves are not cached, edits drop the cached page
+        self.client.get(self.url + '?moves=1↻')
+        self.assertEqual(page_cache().get(key)[1], html)
+        self.custom.save()
+        self.assertIsNone(page_cache().get(key))
+
+
+class JobTests(TestCase):
+    # Submitted puzzles are solved once by one worker and become customs when solvable.
+
+    def setUp(self):
+        solutions.entries.clear()
+        self.outline = Outline.objects.create(index=1, board=[1, 1, 1, 2, 2, 2], rows=2, cols=3)
+
+    def enqueue(self, disabled_nodes: list, fingerprint: str):
+        board = [2, 1, 1, 1, 2, 2]
+        return jobs.enqueue(board, [value - 1 for value in board], disabled_nodes, {}, self.outline, fingerprint)
+
+    def test_solvable(self):
+        job = self.enqueue([], 'a')
+        self.assertEqual(self.enqueue([], 'a'), job)
+        claimed = jobs.claim()
+        self.assertEqual((claimed, claimed.status), (job, SolveJob.RUNNING))
+        self.assertIsNone(jobs.claim())
+        jobs.run(claimed)
+        claimed.refresh_from_db()
+        self.assertEqual(claimed.status, SolveJob.DONE)
+        self.assertEqual((claimed.custom.fingerprint, claimed.custom.moves_min_num), ('a', 1))
+        self.assertIn('url', jobs.job_response(claimed))
+
+    def test_unsolvable(self):
+        job = self.enqueue([[key, True, True] for key in range(1, 8)], 'b')
+        jobs.run(jobs.claim())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (SolveJob.FAILED, 'The puzzle is unsolvable.'))
+        self.assertFalse(Custom.objects.exists())
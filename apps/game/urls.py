@@ -4,7 +4,7 @@ from django.urls import path
 from django.urls.converters import register_converter, StringConverter
 
 from .constants import CUSTOM_GAME_STR, CUSTOM_GAME_SLUG_LENGTH
-from .views import track, DailyView, CustomView, CreateView, post_create
+from .views import track, DailyView, CustomView, CreateView, post_create, solve_job, hint
 
 
 class DateConverter:
@@ -31,6 +31,8 @@ urlpatterns = [
     path('', DailyView.as_view(), name='daily'),
     path('create/', CreateView.as_view(), name='create'),
     path('post-create/', post_create, name='post-create'),
+    path('solve-job/<int:job_id>/', solve_job, name='solve-job'),
+    path('hint/', hint, name='hint'),
     path('<yyyy-mm-dd:date>/', DailyView.as_view(), name='daily'),
     path('<alpha_num_7:slug>/', CustomView.as_view(), name='custom'),
     path('track/', track, name='track'),
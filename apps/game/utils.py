@@ -1,3 +1,4 @@
+import hashlib
 import itertools
 import math
 import random
@@ -29,16 +30,28 @@ def encode(s: Sequence[Any], fixed_areas: dict, for_outline: bool=False) -> tupl
     return tuple(pattern)
 
 
+def relabel(state: Sequence[int]) -> tuple[int, ...]:
+    # `encode` of a state that is encoded already: fixed areas keep their negative values and the
+    # other groups are numbered again by first appearance. A move only permutes cells, so this
+    # is all a successor needs.
+    mapping = {}
+    for value in state:
+        if value not in mapping:
+            mapping[value] = value if value < 0 else len(mapping) + 1
+    return tuple([mapping[value] for value in state])
+
+
+def search_limits(max_path_length: int | None) -> dict[str, float]:
+    # depths of the two sides of a bidirectional search, the start side takes the odd move
+    if max_path_length is None:
+        return dict(start=math.inf, goal=math.inf)
+    return dict(start=max_path_length // 2 + max_path_length % 2, goal=max_path_length // 2)
+
+
 def generate_random_square(n: int) -> tuple[tuple[int, ...], ...]:
-    numbers = list(range(1, n + 1))
-    random.shuffle(numbers)
-    square = [0] * n ** 2
-    while numbers:
-        number = numbers.pop()
-        combinations = list(itertools.combinations([i for i, v in enumerate(square) if v == 0], n))
-        random.shuffle(combinations)
-        for c in combinations[0]:
-            square[c] = number
+    # n cells of every number, shuffled: each board is drawn with the same probability
+    square = [number for number in range(1, n + 1) for _ in range(n)]
+    random.shuffle(square)
     return tuple([tuple(square[i: i + n]) for i in range(0, n ** 2, n)])
 
 
@@ -61,6 +74,17 @@ def generate_all_boards(n: int) -> Iterable[tuple[int, ...]]:
     yield from inner([0] * n ** 2, 0)
 
 
-def lst_to_lst_of_lsts(lst: Sequence[Any]) -> Sequence[Sequence[Any]]:
-    split = int(math.sqrt(len(lst)))
+def lst_to_lst_of_lsts(lst: Sequence[Any], cols: int | None = None) -> Sequence[Sequence[Any]]:
+    # square boards unless the number of columns is given
+    split = cols or int(math.sqrt(len(lst)))
     return tuple(tuple(lst[i: i + split]) for i in range(0, len(lst), split))
+
+
+def custom_fingerprint(board: Sequence[int], disabled_nodes: Iterable[Sequence[Any]], fixed_areas: dict,
+                       outline_id: int) -> str:
+    # JSONField round trips turn tuples into lists and dict keys into strings, so everything is normalised first.
+    normalised = (tuple(int(c) for c in board),
+                  tuple(sorted((int(k), bool(d), bool(r)) for k, d, r in disabled_nodes)),
+                  tuple(sorted((int(k), int(v)) for k, v in fixed_areas.items())),
+                  int(outline_id))
+    return hashlib.sha256(repr(normalised).encode()).hexdigest()
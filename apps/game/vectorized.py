@@ -0,0 +1,195 @@
+from collections.abc import Sequence
+
+try:
+    import numpy as np
+except ImportError:  # optional, solve() falls back to solver.bfs without it
+    np = None
+
+from .board import NodeSet
+from .budget import Budget, BudgetExceeded
+from .packing import BITS, MASK, MAX_PACKED_LABEL, SIGN, pack
+from .tables import UNREACHABLE, StateIndex
+from .utils import search_limits
+
+# rows unpacked at once, bounds the temporary arrays of a layer expansion
+CHUNK_ROWS = 1 << 15
+# bytes per visited state: the packed state in its layer and in the sorted visited array
+STATE_BYTES = 16
+
+
+def numpy_available(goal: Sequence[int]) -> bool:
+    return np is not None and len(goal) * BITS <= 64 and max(map(abs, goal)) <= MAX_PACKED_LABEL
+
+
+class LayerExpander:
+    """
+    Applies every move of a move set to a whole layer of packed states at once: the layer is
+    unpacked to a (states, cells) array, each move is a column permutation, and the groups are
+    renumbered by first appearance like `utils.encode` before packing again.
+    """
+
+    def __init__(self, goal: Sequence[int], forward: Sequence[Sequence[int]], backward: Sequence[Sequence[int]]):
+        cells = len(goal)
+        fixed = sorted({label for label in goal if label < 0})
+        # the fixed areas and every id a group can get, 1..number of labels
+        self.labels = np.array(fixed + list(range(1, len(set(goal)) + 1)), dtype=np.int8)
+        self.free = self.labels > 0
+        self.index_of = np.zeros(1 << BITS, dtype=np.intp)
+        self.index_of[self.labels & MASK] = np.arange(len(self.labels))
+        self.shifts = np.arange(cells, dtype=np.uint64) * np.uint64(BITS)
+        self.forward = [np.array(permutation, dtype=np.intp) for permutation in forward]
+        self.backward = [np.array(permutation, dtype=np.intp) for permutation in backward]
+
+    def unpack(self, packed: 'np.ndarray') -> 'np.ndarray':
+        values = ((packed[:, None] >> self.shifts) & np.uint64(MASK)).astype(np.int8)
+        values[values >= SIGN] -= 1 << BITS
+        return values
+
+    def pack(self, states: 'np.ndarray') -> 'np.ndarray':
+        nibbles = (states.astype(np.uint64) & np.uint64(MASK)) << self.shifts
+        return np.bitwise_or.reduce(nibbles, axis=1)
+
+    def relabel(self, states: 'np.ndarray') -> 'np.ndarray':
+        rows, cells = states.shape
+        indices = self.index_of[states & MASK]
+        # first cell of every label, written back to front, labels a state does not use stay last
+        first = np.full((rows, len(self.labels)), cells, dtype=np.int8)
+        row_numbers = np.arange(rows)
+        for cell in range(cells - 1, -1, -1):
+            first[row_numbers, indices[:, cell]] = cell
+        ranks = (first[:, None, :] < first[:, :, None]).sum(axis=2, dtype=np.int8)
+        mapping = np.where(self.free, ranks + 1, self.labels).astype(np.int8)
+        return np.take_along_axis(mapping, indices, axis=1)
+
+    def expand(self, layer: 'np.ndarray', reverse: bool = False) -> 'np.ndarray':
+        # sorted unique packed neighbours of all states of the layer
+        permutations = self.backward if reverse else self.forward
+        results = []
+        for start in range(0, len(layer), CHUNK_ROWS):
+            states = self.unpack(layer[start: start + CHUNK_ROWS])
+            for permutation in permutations:
+                results.append(self.pack(self.relabel(states[:, permutation])))
+        return unique(np.concatenate(results)) if results else layer[:0]
+
+
+def permutations(nodes: NodeSet) -> tuple[list[tuple[int, ...]], list[tuple[int, ...]]]:
+    return ([permutation for permutation, _ in nodes.moves.forward_permutations],
+            [permutation for permutation, _ in nodes.moves.backward_permutations])
+
+
+def unique(values: 'np.ndarray') -> 'np.ndarray':
+    # sorting is much faster than the hash based np.unique for uint64
+    if not len(values):
+        return values
+    values = np.sort(values)
+    return values[np.concatenate(([True], values[1:] != values[:-1]))]
+
+
+def contains(sorted_array: 'np.ndarray', values: 'np.ndarray') -> 'np.ndarray':
+    if not len(sorted_array):
+        return np.zeros(len(values), dtype=bool)
+    positions = np.searchsorted(sorted_array, values)
+    positions[positions == len(sorted_array)] = 0
+    return sorted_array[positions] == values
+
+
+def numpy_distance_table(goal: tuple[int, ...], nodes: NodeSet) -> bytearray:
+    # solver.build_distance_table one whole layer at a time: breadth-first backwards from the
+    # goal over packed states, each new layer ranked at once and written to the table.
+    index = StateIndex(goal)
+    expander = LayerExpander(goal, *permutations(nodes))
+    table = np.full(index.size, UNREACHABLE, dtype=np.uint8)
+    layer = visited = np.array([pack(goal)], dtype=np.uint64)
+    depth = 0
+    while len(layer) and depth < UNREACHABLE:
+        found = []
+        for start in range(0, len(layer), CHUNK_ROWS):
+            chunk = layer[start: start + CHUNK_ROWS]
+            table[index.rank_many(expander.unpack(chunk))] = depth
+            candidates = expander.expand(chunk, reverse=True)
+            found.append(candidates[~contains(visited, candidates)])
+        layer = unique(np.concatenate(found))
+        # both are sorted, the stable sort merges them in linear time
+        visited = np.sort(np.concatenate((visited, layer)), kind='stable')
+        depth += 1
+    return bytearray(table)
+
+
+def _trace(layers: list['np.ndarray'], state: int, depth: int, nodes: NodeSet, reverse: bool) -> list[tuple]:
+    # Walks from a state of layers[depth] to layers[0], one move per layer.
+    path = []
+    for previous in reversed(layers[:depth]):
+        for neighbor, mv in nodes.packed_moves.neighbors(state, reverse=reverse):
+            if contains(previous, np.array([neighbor], dtype=np.uint64))[0]:
+                break
+        path.append(mv)
+        state = neighbor
+    return path
+
+
+def numpy_bfs(start: tuple[int, ...], goal: tuple[int, ...], nodes: NodeSet, fixed_areas: dict,
+              stats: dict | None = None, budget: Budget | None = None,
+              max_path_length: int | None = 25) -> Sequence[tuple] | None:
+    # Bidirectional breadth-first search one whole layer at a time. Like solver.bfs it only
+    # takes encoded states that fit `packing.pack`, see `numpy_available`.
+    if start == goal:
+        return []
+
+    expander = LayerExpander(goal, *permutations(nodes))
+    sides = {}
+    for name, state in (('start', start), ('goal', goal)):
+        layer = np.array([pack(state)], dtype=np.uint64)
+        sides[name] = dict(layers=[layer], visited=layer)
+    limits = search_limits(max_path_length)
+    peak_frontier = 2
+    expanded = 0
+
+    def update_stats():
+        if stats is not None:
+            stats.update(peak_frontier=peak_frontier, expanded=expanded,
+                         visited=sum(len(side['visited']) for side in sides.values()))
+
+    while all(len(side['layers'][-1]) for side in sides.values()):
+        progressed = False
+        for name, other in (('start', 'goal'), ('goal', 'start')):
+            side = sides[name]
+            layer = side['layers'][-1]
+            if len(side['layers']) > limits[name]:
+                continue
+            if budget is not None:
+                visited = sum(len(s['visited']) for s in sides.values())
+                try:
+                    # the candidate array is the peak of a layer expansion
+                    budget.check(visited + len(layer) * len(expander.forward), state_size=STATE_BYTES)
+                    budget.poll()
+                except BudgetExceeded:
+                    update_stats()
+                    raise
+            candidates = expander.expand(layer, reverse=name == 'goal')
+            expanded += len(layer)
+            layer = candidates[~contains(side['visited'], candidates)]
+            side['layers'].append(layer)
+            side['visited'] = np.sort(np.concatenate((side['visited'], layer)))
+            peak_frontier = max(peak_frontier, len(layer) + len(sides[other]['layers'][-1]))
+            progressed = True
+
+            meeting = np.intersect1d(layer, sides[other]['visited'], assume_unique=True)
+            if len(meeting):
+                # the shortest meeting is with the shallowest layer of the other side
+                for depth, other_layer in enumerate(sides[other]['layers']):
+                    found = meeting[contains(other_layer, meeting)]
+                    if len(found):
+                        break
+                state = int(found[0])
+                depths = {name: len(side['layers']) - 1, other: depth}
+                path_start = _trace(sides['start']['layers'], state, depths['start'], nodes, reverse=True)
+                path_goal = _trace(sides['goal']['layers'], state, depths['goal'], nodes, reverse=False)
+                update_stats()
+                return path_start[::-1] + path_goal
+        if not progressed:
+            break
+    update_stats()
+    if stats is not None:
+        # an empty layer means that side has seen every state it can reach
+        stats['exhausted'] = not all(len(side['layers'][-1]) for side in sides.values())
+    return None  # unsolvable or deeper than max_path_length
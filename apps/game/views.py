@@ -1,25 +1,97 @@
 import datetime
+import hashlib
 import json
-import math
-import random
 import re
 from collections import defaultdict
 
 from django.conf import settings
-from django.http import Http404, JsonResponse
+from django.db.models import OuterRef, Subquery
+from django.http import Http404, HttpResponse, JsonResponse
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.functional import cached_property
+from django.utils.http import http_date, quote_etag
 from django.views.generic import TemplateView
 
-from .board import init_borders, Cell, Horizontal, Vertical, get_nodes
-from .constants import (START_DATE, DATE_FORMAT, JS_DATE_FORMAT, CUSTOM_GAME_STR, CUSTOM_GAME_SLUG_LENGTH)
-from .utils import encode
-from .models import Daily, Custom, Outline
+from .board import init_borders, Cell, Horizontal, NodeSet, Vertical, get_nodes
+from .caching import cache_key, page_cache, page_key, page_version
+from .constants import (START_DATE, DATE_FORMAT, JS_DATE_FORMAT, DEFAULT_BOARD_SIDE, MIN_BOARD_SIDE,
+                        MAX_BOARD_SIDE, DAILY_MAX_AGE, CUSTOM_MAX_AGE)
+from .utils import encode, custom_fingerprint
+from .events import events, parse_event
+from .hints import hint as get_hint
+from .jobs import enqueue, job_response
+from .models import Daily, Custom, Outline, RenderedDaily, SolveJob
+from .replay import InvalidMove
 from .solver import solve, is_solved
 
 
+def parse_moves(text: str, nodes: NodeSet) -> list[tuple[int, str]]:
+    symbols = ''.join({symbol for node in nodes for symbol in (node.symbol, node.reverse_symbol)})
+    return [(int(k), v) for k, v in re.findall(fr'(\d+)\s*([{symbols}])', text)]
+
+
+def today() -> datetime.datetime:
+    # a new daily puzzle starts at 5am server time
+    return datetime.datetime.now() - datetime.timedelta(hours=7 if settings.DEBUG else 5)
+
+
 class GameView(TemplateView):
     model_class = None
 
+    def get(self, request, *args, **kwargs):
+        # Pages only change with their game, a deploy or the daily rollover, so conditional
+        # requests are answered before rendering and CDNs may keep the page.
+        if settings.DEBUG:
+            return self.get_page(request, *args, **kwargs)
+        etag = quote_etag(hashlib.sha256(repr(self.get_page_key()).encode()).hexdigest()[:32])
+        last_modified = self.get_last_modified()
+        response = (get_conditional_response(request, etag=etag, last_modified=int(last_modified.timestamp())) or
+                    self.get_page(request, *args, **kwargs))
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = http_date(last_modified.timestamp())
+        patch_cache_control(response, public=True, max_age=self.get_max_age())
+        return response
+
+    def get_page(self, request, *args, **kwargs):
+        # the page cache keeps pages that look the same for a whole day, not the ?moves= variants
+        if not self.is_cacheable():
+            return super().get(request, *args, **kwargs)
+        key, version = page_key(self.model_class.__name__, self.game.index), cache_key(*self.get_page_key())
+        cached = page_cache().get(key)
+        if cached is not None and cached[0] == version:
+            return HttpResponse(cached[1])
+        response = super().get(request, *args, **kwargs).render()
+        page_cache().set(key, (version, response.content.decode()))
+        return response
+
+    def is_cacheable(self) -> bool:
+        return not self.request.GET
+
+    def get_page_key(self) -> tuple:
+        # everything the page is rendered from, ?moves= replays moves on it
+        game, outline = self.game, self.game.outline
+        return (self.model_class.__name__, game.pk, game.index, game.board, game.disabled_nodes, game.fixed_areas,
+                game.moves_min_num, outline.board, outline.rows, outline.cols, self.request.GET.get('moves', ''),
+                page_version()[0])
+
+    def get_last_modified(self) -> datetime.datetime:
+        return max(self.game.updated_at, page_version()[1])
+
+    def get_max_age(self) -> int:
+        return CUSTOM_MAX_AGE
+
+    @cached_property
+    def game(self):
+        try:
+            return self.get_queryset().get(index=self.get_game_index())
+        except self.model_class.DoesNotExist:
+            raise Http404
+
+    def get_queryset(self):
+        return self.model_class.objects.select_related('outline')
+
     def get_game_index(self):
         raise NotImplementedError
 
@@ -28,43 +100,39 @@ class GameView(TemplateView):
 
     def get_context_data(self, **kwargs):
         context_data = super().get_context_data(**kwargs)
-        try:
-            game = self.model_class.objects.select_related('outline').get(index=self.get_game_index())
-        except self.model_class.DoesNotExist:
-            raise Http404
-        size = int(math.sqrt(len(game.board)))
+        game = self.game
         outline = game.outline
+        rows, cols = outline.rows, outline.cols
 
         board = encode(game.board, game.fixed_areas_as_int)
         outline_board = encode(outline.board, game.fixed_areas_as_int, for_outline=True)
-        nodes = get_nodes(size, size, game.disabled_nodes_as_dict)
-        symbols = set()
-        for node in nodes:
-            symbols.update([node.symbol, node.reverse_symbol])
-        moves_re = re.findall(fr'[1-9]\s*[{symbols}]', self.request.GET.get('moves', ''))
-        pre_moves = [(int(k), v) for k, v in moves_re]
+        nodes = get_nodes(rows, cols, game.disabled_nodes_as_dict)
+        pre_moves = parse_moves(self.request.GET.get('moves', ''), nodes)
         if settings.DEBUG:
-            solution = solve(board=board,
-                             outline=outline_board,
-                             nodes=nodes,
-                             fixed_areas=game.fixed_areas_as_int)
-            if solution:
-                solution = ' '.join(f'{i}{v}' for i, v in solution)
-            print(solution)
+            result = solve(board=board,
+                           outline=outline_board,
+                           nodes=nodes,
+                           fixed_areas=game.fixed_areas_as_int)
+            print(' '.join(f'{i}{v}' for i, v in result.moves) if result.solved else result.status, result.stats)
 
         vals = list(game.fixed_areas_as_int.values())
-        bordered_board = init_borders(outline=outline_board, board=[-ch if ch in vals else ch for ch in game.board])
-        bordered_outline = init_borders(outline=outline_board)
-        context_data.update(dict(size=size,
+        bordered_board = init_borders(outline=outline_board, board=[-ch if ch in vals else ch for ch in game.board],
+                                      cols=cols)
+        bordered_outline = init_borders(outline=outline_board, cols=cols)
+        context_data.update(dict(rows=rows,
+                                 cols=cols,
                                  game=game,
                                  board=bordered_board,
                                  outline=bordered_outline,
                                  outline_dumped=json.dumps(outline_board),
                                  pre_moves=pre_moves,
                                  pre_moves_dumped=json.dumps(pre_moves),
-                                 is_solved=is_solved(board, outline_board, pre_moves,
-                                                     game.fixed_areas_as_int, game.disabled_nodes_as_dict),
+                                 is_solved=is_solved(board, outline_board, pre_moves, nodes),
                                  nodes=nodes,
+                                 # the {% cache %} fragments of base.html
+                                 fragment_keys=dict(outline=cache_key(outline_board, cols),
+                                                    board=cache_key(outline_board, game.board, vals, cols),
+                                                    nodes=cache_key(rows, cols, game.disabled_nodes)),
                                  canonical_url=settings.SITE_DOMAIN + self.get_canonical_url(),
                                  moves_max_num=game.moves_min_num * 100))
         return context_data
@@ -89,10 +157,13 @@ class DailyMixin:
         self.today_date = None
         self.game_index = None
         self.current_date = None
+        # a page under its date, not the page of today at the plain URL
+        self.archived = False
 
     def setup(self, request, *args, date=None, **kwargs):
         super().setup(request, *args, **kwargs)
-        self.today_date = datetime.datetime.now() - datetime.timedelta(hours=7 if settings.DEBUG else 5)
+        self.archived = date is not None
+        self.today_date = self.get_today()
         days_passed = (self.today_date - START_DATE).days
         if date is not None:
             self.game_index = (date - START_DATE).days
@@ -103,6 +174,33 @@ class DailyMixin:
             self.game_index = days_passed
             self.current_date = self.today_date
 
+    def get_today(self) -> datetime.datetime:
+        return today()
+
+    def until_rollover(self) -> datetime.timedelta:
+        day_start = self.today_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        return day_start + datetime.timedelta(days=1) - self.today_date
+
+    def get_page_key(self) -> tuple:
+        # every page shows the dates up to today's puzzle
+        return super().get_page_key() + ((self.today_date - START_DATE).days,)
+
+    def get_last_modified(self) -> datetime.datetime:
+        rollover = timezone.now() - (datetime.timedelta(days=1) - self.until_rollover())
+        return max(super().get_last_modified(), rollover)
+
+    def get_max_age(self) -> int:
+        # archived pages change at the rollover, today's puzzle may be edited until then
+        max_age = int(self.until_rollover().total_seconds())
+        return min(max_age, DAILY_MAX_AGE) if self.is_today() else max_age
+
+    def is_today(self) -> bool:
+        return self.game_index == (self.today_date - START_DATE).days
+
+    def is_cacheable(self) -> bool:
+        # today's puzzle is stored by prerender_dailies
+        return super().is_cacheable() and not self.is_today()
+
     def get_context_data(self, date=None, **kwargs):
         context_data = super().get_context_data(**kwargs)
         context_data.update(dict(current_date=self.current_date.strftime(DATE_FORMAT),
@@ -116,6 +214,23 @@ class DailyView(DailyMixin, GameView):
     template_name = 'game/daily.html'
     model_class = Daily
 
+    def get_page(self, request, *args, date=None, **kwargs):
+        # today's puzzle is the same for everybody, prerender_dailies stores its page ahead of time
+        if self.serves_rendered() and self.game.rendered_html is not None:
+            return HttpResponse(self.game.rendered_html)
+        return super().get_page(request, *args, date=date, **kwargs)
+
+    def serves_rendered(self) -> bool:
+        return not self.archived and not self.request.GET and not settings.DEBUG
+
+    def get_queryset(self):
+        # the stored page of the current templates comes with the puzzle in one query
+        queryset = super().get_queryset()
+        if not self.serves_rendered():
+            return queryset
+        rendered = RenderedDaily.objects.filter(index=OuterRef('index'), version=page_version()[0])
+        return queryset.annotate(rendered_html=Subquery(rendered.values('html')[:1]))
+
     def get_game_index(self):
         return self.game_index
 
@@ -145,14 +260,14 @@ class CreateView(TemplateView):
 
     def get_context_data(self, **kwargs):
         context_data = super().get_context_data(**kwargs)
-        outlines = Outline.objects.all()
-        size2 = len(outlines[0].board)
-        size = int(math.sqrt(size2))
+        rows, cols = board_dimensions(self.request.GET) or (DEFAULT_BOARD_SIDE, DEFAULT_BOARD_SIDE)
+        cells = rows * cols
         context_data.update(
-            size=size,
-            nodes=get_nodes(size, size),
-            empty_outline=init_borders([0] * size2),
-            empty_board=init_borders([0] * size2, [0] * size2),
+            rows=rows,
+            cols=cols,
+            nodes=get_nodes(rows, cols),
+            empty_outline=init_borders([0] * cells, cols=cols),
+            empty_board=init_borders([0] * cells, [0] * cells, cols=cols),
             names=[(i, Cell.names_dict[i], c) for i, c in Cell.colors_dict.items()],
             tetraminoes=[dict(name='I',
                               cells=[Cell(0, 0, True, dict(left=True, top=True, bottom=True)),
@@ -195,20 +310,34 @@ class CreateView(TemplateView):
 
 
 def track(request):
-    if not settings.DEBUG:
-        from django.core.mail import send_mail
-        send_mail('Rotatly',
-                  request.POST,
-                  None,
-                  [a[1] for a in settings.ADMINS])
+    # finished and shared games from game.coffee, written in batches, see mail_event_digest for the mails
+    event = parse_event(request.POST)
+    if event is None:
+        return JsonResponse({'error': 'Invalid event.'})
+    events.add(event)
     return JsonResponse({})
 
 
+def board_dimensions(params) -> tuple[int, int] | None:
+    try:
+        rows = int(params.get('rows', DEFAULT_BOARD_SIDE))
+        cols = int(params.get('cols', DEFAULT_BOARD_SIDE))
+    except ValueError:
+        return None
+    if not (MIN_BOARD_SIDE <= rows <= MAX_BOARD_SIDE and MIN_BOARD_SIDE <= cols <= MAX_BOARD_SIDE):
+        return None
+    return rows, cols
+
+
 def post_create(request):
     if False and not request.user.is_authenticated:
         return JsonResponse({'error': 'You should be logged in.'})
 
-    elements = (1, 2, 3, 4)
+    dimensions = board_dimensions(request.POST)
+    if dimensions is None:
+        return JsonResponse({'error': 'Invalid size.'})
+    rows, cols = dimensions
+    cells = rows * cols
 
     outline = []
     mapping = {}
@@ -219,12 +348,15 @@ def post_create(request):
             next_id += 1
         outline.append(mapping[item])
 
-    if len(outline) != 16:
+    if len(outline) != cells:
         return JsonResponse({'error': 'Incomplete outline.'})
 
-    if len(mapping) != 4:
+    if not 2 <= len(mapping) <= len(Cell.colors_dict):
         return JsonResponse({'error': 'Invalid outline.'})
 
+    elements = tuple(range(1, len(mapping) + 1))
+    area_sizes = {k + 1: outline.count(k) for k in range(len(mapping))}
+
     fixed_areas = {}
     for item in request.POST.get('fixed_areas', '').replace(' ', '').split(','):
         try:
@@ -235,7 +367,7 @@ def post_create(request):
             if key in mapping:
                 try:
                     value = int(value)
-                    if not 1 <= value <= 4:
+                    if value not in elements:
                         raise Exception
                 except:
                     continue
@@ -245,7 +377,7 @@ def post_create(request):
     vals_n = len(vals)
     if vals_n != len(set(vals)):
         return JsonResponse({'error': 'Invalid outline.'})
-    if vals_n == 3:
+    if vals_n == len(elements) - 1:
         els = set(elements)
         k = els.difference(fixed_areas.keys()).pop()
         v = els.difference(vals).pop()
@@ -256,45 +388,41 @@ def post_create(request):
     for item in request.POST.get('board', '').replace(' ', '').split(','):
         try:
             n = int(item)
-            if not 1 <= n <= 4:
+            if n not in elements:
                 raise Exception
             board.append(n)
         except:
             pass
 
-    if len(board) != 16:
+    if len(board) != cells:
         return JsonResponse({'error': 'Incomplete board.'})
 
-    if any(len([c for c in board if c == e]) != 4 for e in elements):
+    # every colour has to fill an area, a fixed colour its own one
+    counts = {e: board.count(e) for e in elements}
+    if sorted(counts.values()) != sorted(area_sizes.values()) or any(
+            counts[v] != area_sizes[k] for k, v in fixed_areas.items()):
         return JsonResponse({'error': 'Invalid board.'})
 
+    all_nodes = get_nodes(rows, cols)
+    # disabled_nodes keys are positions in get_nodes, starting at 1
+    keys = {(node.name(), node.index): key for key, node in enumerate(all_nodes, start=1)}
+    directions = {Vertical.symbol: ('vertical', 'direct'), Vertical.reverse_symbol: ('vertical', 'reverse'),
+                  Horizontal.symbol: ('horizontal', 'direct'), Horizontal.reverse_symbol: ('horizontal', 'reverse')}
     nodes = defaultdict(dict)
     for item in request.POST.get('nodes', '').replace(' ', '').split(','):
-        if len(item) == 1:
-            try:
-                n = int(item)
-                if not 1 <= n <= 9:
-                    raise Exception
-                nodes[n] = {"direct": True, "reverse": True}
-            except:
-                pass
-        elif len(item) == 2:
-            digit, direction = item
-            try:
-                n = int(digit)
-                if not 1 <= n <= 4:
-                    raise Exception
-            except:
-                pass
-            else:
-                if direction == Vertical.symbol:
-                    nodes[n + 9]['direct'] = True
-                elif direction == Vertical.reverse_symbol:
-                    nodes[n + 9]['reverse'] = True
-                elif direction == Horizontal.symbol:
-                    nodes[n + 9 + 4]['direct'] = True
-                elif direction == Horizontal.reverse_symbol:
-                    nodes[n + 9 + 4]['reverse'] = True
+        match = re.fullmatch(fr'(\d+)([{"".join(directions)}]?)', item)
+        if match is None:
+            continue
+        n, direction = int(match[1]), match[2]
+        if not direction:
+            key = keys.get(('rotate', n))
+            if key is not None:
+                nodes[key] = {"direct": True, "reverse": True}
+        else:
+            name, flag = directions[direction]
+            key = keys.get((name, n))
+            if key is not None:
+                nodes[key][flag] = True
 
     nodes = [(k, v.get('direct', False), v.get('reverse', False)) for k, v in sorted(nodes.items(), key=lambda o: o[0])]
     inactive = 0
@@ -303,7 +431,7 @@ def post_create(request):
             inactive += 1
         if c:
             inactive += 1
-    if inactive == 9 + 4 + 4:
+    if inactive == 2 * len(all_nodes):
         return JsonResponse({'error': 'No active nodes.'})
 
     m = {}
@@ -317,29 +445,60 @@ def post_create(request):
 
     outline = tuple(outline)
     try:
-        outline_obj = Outline.objects.get(board=outline)
+        outline_obj = Outline.objects.get(board=outline, rows=rows, cols=cols)
     except Outline.DoesNotExist:
         return JsonResponse({'error': 'Invalid outline.'})
 
     board = tuple(board)
+    fingerprint = custom_fingerprint(board, nodes, fixed_areas, outline_obj.pk)
+    game = Custom.objects.filter(fingerprint=fingerprint).first()
+    if game is not None:
+        return JsonResponse({'url': settings.SITE_DOMAIN + reverse('custom', args=(game.index,))})
+    # solved by run_solve_workers, the client polls solve_job for the result
+    job = enqueue(board, encoded_board, nodes, fixed_areas, outline_obj, fingerprint)
+    return JsonResponse(job_response(job))
+
+
+def solve_job(request, job_id):
+    try:
+        job = SolveJob.objects.select_related('custom').get(pk=job_id)
+    except SolveJob.DoesNotExist:
+        raise Http404
+    return JsonResponse(job_response(job))
+
+
+def hint(request):
+    # ?daily=<index> or ?custom=<slug>, with the moves played so far in the format of ?moves=
+    if 'daily' in request.GET:
+        try:
+            index = int(request.GET['daily'])
+        except ValueError:
+            raise Http404
+        if not 0 < index <= (today() - START_DATE).days:
+            raise Http404
+        model_class = Daily
+    elif 'custom' in request.GET:
+        index = request.GET['custom']
+        model_class = Custom
+    else:
+        raise Http404
+    try:
+        game = model_class.objects.select_related('outline').get(index=index)
+    except model_class.DoesNotExist:
+        raise Http404
+    fixed_areas = game.fixed_areas_as_int
+    nodes = get_nodes(game.outline.rows, game.outline.cols, game.disabled_nodes_as_dict)
     try:
-        game = Custom.objects.get(board=board, disabled_nodes=nodes, fixed_areas=fixed_areas, outline=outline_obj)
-    except Custom.DoesNotExist:
-        game = Custom(board=board,
-                      disabled_nodes=nodes,
-                      fixed_areas=fixed_areas,
-                      outline=outline_obj,
-                      encoded_board=encoded_board,
-                      index=''.join(random.choices(CUSTOM_GAME_STR, k=CUSTOM_GAME_SLUG_LENGTH)))
-        solution = solve(board=encode(board, fixed_areas),
-                         outline=encode(outline_obj.board, fixed_areas, for_outline=True),
-                         nodes=get_nodes(4, 4, game.disabled_nodes_as_dict),
-                         fixed_areas=fixed_areas)
-        if solution is None:
-            return JsonResponse({'error': 'The puzzle is unsolvable.'})
-        n = len(solution)
-        if n == 0:
-            return JsonResponse({'error': 'The puzzle is already solved.'})
-        game.moves_min_num = n
-        game.save()
-    return JsonResponse({'url': settings.SITE_DOMAIN + reverse('custom', args=(game.index,))})
+        result = get_hint(board=encode(game.board, fixed_areas),
+                          outline=encode(game.outline.board, fixed_areas, for_outline=True),
+                          nodes=nodes,
+                          fixed_areas=fixed_areas,
+                          moves=parse_moves(request.GET.get('moves', ''), nodes))
+    except InvalidMove:
+        return JsonResponse({'error': 'Invalid move.'})
+    if result is None:
+        return JsonResponse({'error': 'No hint available.'})
+    if not result.solved:
+        return JsonResponse({'error': 'The puzzle is unsolvable.'})
+    return JsonResponse({'move': ''.join(f'{i}{symbol}' for i, symbol in result.moves) or None,
+                         'distance': result.stats['distance']})
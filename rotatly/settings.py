@@ -137,11 +137,33 @@ STATICFILES_DIRS = (
 
 STATIC_ROOT = BASE_DIR / 'static_production'
 
+DISTANCE_TABLES_DIR = BASE_DIR / 'tables'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # rendered pages and fragments, on disk so every worker shares them, see apps/game/caching.py
+    'pages': {
+        'BACKEND': 'apps.game.caching.CountingFileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'pages',
+        'TIMEOUT': 24 * 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+}
+
 DEBUG = os.getenv("DEBUG", 'True').lower() == 'true'
 
 if DEBUG:
     ALLOWED_HOSTS = []
 
+    # templates are rendered fresh while developing
+    CACHES['pages'] = {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }
+
     # Database
     # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
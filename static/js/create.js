@@ -1,6 +1,6 @@
 // Generated by CoffeeScript 2.7.0
 (function() {
-  var M, N, board_palette_dom, color_palette_dom, create_clone, draggable_item_clone, error_field, game_board, game_dom, game_grid, get_tetramino_data, get_tetramino_indices, i, item, l, len, nodes, outline_board, outline_dom, ref, remove_data, response_field, selected_color_icon, set_data, set_error, set_response, snap_targets, tetramino_click_handler, tetramino_color_click_handler;
+  var M, N, board_palette_dom, color_limit, color_palette_dom, create_clone, draggable_item_clone, error_field, game_board, game_dom, game_grid, get_tetramino_data, get_tetramino_indices, handle_create_response, i, item, l, len, nodes, outline_board, outline_dom, ref, remove_data, response_field, selected_color_icon, set_data, set_error, set_response, snap_targets, tetramino_click_handler, tetramino_color_click_handler, update_board_palette;
 
   selected_color_icon = null;
 
@@ -117,18 +117,59 @@
     }
   }).styleCursor(false);
 
+  // a colour fills one area: a fixed colour the area of its tetromino, any other the largest one
+  color_limit = function(index) {
+    var el, j, len1, number, ref1, size, sizes, values;
+    sizes = {};
+    outline_board.querySelectorAll('td[data-number]').forEach(function(e) {
+      var number;
+      number = e.getAttribute('data-number');
+      return sizes[number] = (sizes[number] || 0) + 1;
+    });
+    ref1 = document.querySelectorAll('.snapped');
+    for (j = 0, len1 = ref1.length; j < len1; j++) {
+      el = ref1[j];
+      if (el.querySelector('.cell').getAttribute('data-index') === index) {
+        return sizes[el.getAttribute('data-number')];
+      }
+    }
+    values = (function() {
+      var results;
+      results = [];
+      for (number in sizes) {
+        size = sizes[number];
+        results.push(size);
+      }
+      return results;
+    })();
+    if (values.length) {
+      return Math.max(...values);
+    } else {
+      return 2e308;
+    }
+  };
+
+  update_board_palette = function() {
+    return board_palette_dom.querySelectorAll('.board-item').forEach(function(item) {
+      var count;
+      count = game_board.querySelectorAll(`td.${item.getAttribute('data-class')}`).length;
+      if (count >= color_limit(item.getAttribute('data-index'))) {
+        return window.hide_element(item);
+      } else {
+        return window.show_element(item);
+      }
+    });
+  };
+
   interact('#game-container td').dropzone({
     accept: '.board-item',
     overlap: 0.75,
     ondrop: function(evt) {
-      var el, klass, selected_value;
+      var el, selected_value;
       el = evt.target;
       selected_value = evt.relatedTarget;
-      klass = selected_value.getAttribute('data-class');
       set_data(el, selected_value, board_palette_dom);
-      if (game_dom.querySelectorAll(`.${klass}`).length >= 4) {
-        return window.hide_element(selected_value);
-      }
+      return update_board_palette();
     }
   });
 
@@ -155,8 +196,9 @@
     if (selected_color_icon) {
       window.hide_element(selected_color_icon);
       selected_color_icon.classList.remove('selected');
-      return selected_color_icon = null;
+      selected_color_icon = null;
     }
+    return update_board_palette();
   };
 
   document.querySelectorAll('.tetramino').forEach(function(t) {
@@ -674,7 +716,7 @@
         el.remove();
       }
       game_grid.innerHTML = '';
-      return document.querySelectorAll('.snapped').forEach(function(el) {
+      document.querySelectorAll('.snapped').forEach(function(el) {
         var div, html, outline_board_rect, ox, oy, ratio, rotation_angle, shift_x, shift_y, snapped_grid, snapped_rect, source_cell_size, target_cell_size;
         snapped_grid = el.querySelector('.outline-grid');
         html = snapped_grid.innerHTML;
@@ -697,6 +739,7 @@
         div.innerHTML = html;
         return game_grid.appendChild(div);
       });
+      return update_board_palette();
     },
     modifiers: [
       interact.modifiers.snap({
@@ -757,6 +800,20 @@
     return window.hide_element(error_field);
   };
 
+  handle_create_response = function(data) {
+    if (data['error']) {
+      set_error(data['error']);
+    }
+    if (data['url']) {
+      set_response(data['url']);
+    }
+    if (data['status_url']) {
+      return setTimeout(function() {
+        return send_request(data['status_url'], {}, 'GET', handle_create_response);
+      }, 1000);
+    }
+  };
+
   document.getElementById('create-button').addEventListener('click', function() {
     var board, disabled_nodes, fixed_areas, k, outline, v;
     window.hide_element(error_field);
@@ -803,6 +860,8 @@
       return;
     }
     return send_request('/post-create/', {
+      rows: N,
+      cols: M,
       outline: outline.join(','),
       fixed_areas: ((function() {
         var results;
@@ -815,14 +874,7 @@
       })()).join(','),
       board: board.join(','),
       nodes: disabled_nodes.join(',')
-    }, 'POST', function(data) {
-      if (data['error']) {
-        set_error(data['error']);
-      }
-      if (data['url']) {
-        return set_response(data['url']);
-      }
-    });
+    }, 'POST', handle_create_response);
   });
 
 }).call(this);